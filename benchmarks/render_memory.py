@@ -0,0 +1,54 @@
+import gc
+import tracemalloc
+from configgen.constants import *
+from configgen.config_writer import LinePool
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.isis_topology import ISISTopology
+
+NODES = 10000
+
+
+def build_topology() -> ISISTopology:
+    config = dict(DEFAULT_CONFIGS)
+    config[ConfigKeys.DATA_LINK_NETWORK] = "10.0.0.0/8"
+    config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 30
+
+    p2p_topo = PointToPointTopology(name="memory-benchmark", config=config)
+    p2p_topo.generate_point_to_point_topology(
+        [
+            (f"xr{n}", f"100.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}",
+             f"192.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}/8")
+            for n in range(NODES)
+        ],
+        [(n, (n + 1) % NODES) for n in range(NODES)] + [(n, (n + 2) % NODES) for n in range(NODES)]
+    )
+
+    topo = ISISTopology(p2p_topo, "core", config)
+    topo.generate_isis_topology(
+        {key: [(AddressFamily.IPv4_UNICAST, 10)] for key in p2p_topo.interface_mapping.keys()},
+        {n: [(AddressFamily.IPv4_UNICAST, 1)] for n in range(NODES)}
+    )
+    return topo
+
+
+def measure(topo: ISISTopology, pooled: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    line_pool = LinePool() if pooled else None
+    writers = topo.render_writers(line_pool)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines = sum(len(writer.lines()) for writer in writers)
+    unique = f"{len(line_pool)} distinct lines, {len(line_pool.blocks)} distinct blocks" if pooled else \
+        f"{lines} line objects"
+    print(f"{'pooled' if pooled else 'flat':>6}: {current / 2 ** 20:8.2f} MiB "
+          f"for {lines} lines ({unique})")
+    return current
+
+
+if __name__ == '__main__':
+    topology = build_topology()
+    flat = measure(topology, pooled=False)
+    pooled = measure(topology, pooled=True)
+    print(f"saved {(flat - pooled) / 2 ** 20:.2f} MiB ({100 * (flat - pooled) / flat:.1f}%)")
@@ -0,0 +1,47 @@
+import time
+from configgen.constants import *
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.isis_topology import ISISTopology
+from configgen.render_plan import RenderPlan
+
+NODES = 10000
+
+
+def build_topology() -> ISISTopology:
+    config = dict(DEFAULT_CONFIGS)
+    config[ConfigKeys.DATA_LINK_NETWORK] = "10.0.0.0/8"
+    config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 30
+
+    p2p_topo = PointToPointTopology(name="render-plan-benchmark", config=config)
+    p2p_topo.generate_point_to_point_topology(
+        [
+            (f"xr{n}", f"100.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}",
+             f"192.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}/8")
+            for n in range(NODES)
+        ],
+        [(n, (n + 1) % NODES) for n in range(NODES)] + [(n, (n + 2) % NODES) for n in range(NODES)]
+    )
+
+    topo = ISISTopology(p2p_topo, "core", config)
+    topo.generate_isis_topology(
+        {key: [(AddressFamily.IPv4_UNICAST, 10)] for key in p2p_topo.interface_mapping.keys()},
+        {n: [(AddressFamily.IPv4_UNICAST, 1)] for n in range(NODES)}
+    )
+    return topo
+
+
+def measure(topo: ISISTopology) -> float:
+    start = time.perf_counter()
+    for i in range(len(topo.nodes)):
+        topo._render_node(i)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    topology = build_topology()
+    writer = measure(topology)
+    topology.point_to_point_topology.use_render_plan(RenderPlan())
+    planned = measure(topology)
+    print(f"config writer: {writer:.3f} s for {NODES} nodes")
+    print(f"  render plan: {planned:.3f} s for {NODES} nodes")
+    print(f"      speedup: {writer / planned:.1f}x")
@@ -0,0 +1,34 @@
+import time
+from configgen.constants import *
+from configgen.point_to_point_topology import PointToPointTopology
+
+NODES = 20000
+LINKS = 100000
+
+
+def build_topology() -> PointToPointTopology:
+    config = dict(DEFAULT_CONFIGS)
+    config[ConfigKeys.DATA_LINK_NETWORK] = "10.0.0.0/8"
+    config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 30
+
+    topo = PointToPointTopology(name="validate-benchmark", config=config)
+    topo.generate_point_to_point_topology(
+        [
+            (f"xr{n}", f"100.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}",
+             f"192.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}/8")
+            for n in range(NODES)
+        ],
+        [(k % NODES, (k % NODES + 1 + k // NODES) % NODES) for k in range(LINKS)]
+    )
+    return topo
+
+
+if __name__ == '__main__':
+    topology = build_topology()
+
+    start = time.perf_counter()
+    conflicts = topology.validate()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(topology.nodes)} nodes, {len(topology.links)} links: "
+          f"{len(conflicts)} conflicts in {elapsed:.3f}s")
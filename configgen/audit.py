@@ -0,0 +1,149 @@
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import IPv4Interface
+from typing import List, Dict
+from .constants import COMMENT, END, BREAK
+from .deployer import Deployer
+from .groups import ConfigBlock, parse_config
+
+RUNNING_CONFIG_START = "Building configuration..."
+
+RUNNING_CONFIG_END = r"\n" + END + r"\s*\r?\n"
+
+IGNORED_LINES = {"", END, "no shutdown"}
+
+INTERFACE_NAME = re.compile(r"^((?:interface|update-source) [A-Za-z-]+) (?=\d)")
+
+IPV4_ADDRESS = re.compile(r"^ipv4 address (\d+\.\d+\.\d+\.\d+/\d+)$")
+
+
+def _normalize_line(content: str) -> str:
+    content = INTERFACE_NAME.sub(r"\1", content)
+    match = IPV4_ADDRESS.match(content)
+    if match:
+        interface = IPv4Interface(match.group(1))
+        content = f"ipv4 address {interface.ip} {interface.netmask}"
+    return content
+
+
+def normalize_config(text: str) -> str:
+    """
+    Brings a rendered config and a captured running config to a common form: the running
+    config banner, comments and line endings are dropped, interface names lose the space
+    before their number, prefixes are written with a netmask and "no shutdown" (the default
+    the router does not display) is left out.
+    """
+    text = text.replace("\r", "")
+    if RUNNING_CONFIG_START in text:
+        text = text.split(RUNNING_CONFIG_START, 1)[1]
+
+    lines = []
+    for line in text.split("\n"):
+        line = line.rstrip()
+        content = line.lstrip()
+        if content in IGNORED_LINES or content.startswith(COMMENT.strip()):
+            continue
+        lines.append(line[:len(line) - len(content)] + _normalize_line(content))
+
+    return "\n".join(lines)
+
+
+def _canonical(block: ConfigBlock) -> str:
+    if not block.children:
+        return block.line
+    return block.line + "{" + ";".join(sorted(_canonical(child) for child in block.children)) + "}"
+
+
+def section_hashes(text: str) -> Dict[str, str]:
+    sections: Dict[str, List[str]] = {}
+    for block in parse_config(normalize_config(text)):
+        if block.line == BREAK:
+            continue
+        sections.setdefault(block.line, []).append(_canonical(block))
+
+    return {
+        header: hashlib.sha256("\n".join(sorted(parts)).encode("utf-8")).hexdigest()
+        for header, parts in sections.items()
+    }
+
+
+class DriftReport:
+    def __init__(self, hostname: str, missing: List[str] = None, changed: List[str] = None,
+                 unexpected: List[str] = None, error: str = None) -> None:
+        self.hostname = hostname
+        self.missing = missing or []
+        self.changed = changed or []
+        self.unexpected = unexpected or []
+        self.error = error
+
+    @property
+    def in_sync(self) -> bool:
+        return self.error is None and not self.missing and not self.changed
+
+    def __str__(self) -> str:
+        if self.error is not None:
+            return f"{self.hostname}: audit failed: {self.error}"
+        if self.in_sync:
+            return f"{self.hostname}: in sync ({len(self.unexpected)} unmanaged section(s))"
+        return (f"{self.hostname}: {len(self.missing)} missing, {len(self.changed)} changed "
+                f"section(s): " + ", ".join(self.missing + self.changed))
+
+
+def compare_configs(hostname: str, rendered: str, running: str) -> DriftReport:
+    expected = section_hashes(rendered)
+    actual = section_hashes(running)
+
+    return DriftReport(
+        hostname,
+        missing=[header for header in expected if header not in actual],
+        changed=[header for header in expected if header in actual and actual[header] != expected[header]],
+        unexpected=[header for header in actual if header not in expected]
+    )
+
+
+class DriftAuditor:
+    """
+    Captures the running config of every host of a Deployer concurrently and compares it,
+    section by section, with the config rendered locally. Sections present on the router
+    but not rendered are listed as unexpected without counting as drift, since routers
+    carry defaults the generator does not manage.
+    """
+
+    AUDIT_TIMEOUT = 30
+
+    def __init__(self, deployer: Deployer, max_workers: int = None, timeout: int = AUDIT_TIMEOUT) -> None:
+        self.deployer = deployer
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def _fetch_running_config(self, hostname: str) -> str:
+        with self.deployer.session(hostname, self.timeout) as t:
+            t.input("terminal length 0")
+            t.wait_for("#")
+            t.input("show running-config")
+            idx, _, data = t.check_for([RUNNING_CONFIG_END])
+            if idx < 0:
+                raise RuntimeError(f"Timed out reading the running config of {hostname}")
+
+        return data.decode("utf-8")
+
+    def audit_host(self, hostname: str) -> DriftReport:
+        try:
+            running = self._fetch_running_config(hostname)
+            return compare_configs(hostname, self.deployer._read_configs(hostname), running)
+        except (RuntimeError, OSError, EOFError) as e:
+            return DriftReport(hostname, error=str(e))
+
+    def audit(self) -> Dict[str, DriftReport]:
+        hostnames = list(self.deployer.host_ports.keys())
+        if not hostnames:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(hostnames)) as executor:
+            reports = list(executor.map(self.audit_host, hostnames))
+
+        for report in reports:
+            print(report)
+
+        return {report.hostname: report for report in reports}
@@ -1,3 +1,4 @@
+import itertools
 from .isis_topology import *
 
 
@@ -22,17 +23,57 @@ class BGPNeighbor:
             f"update-source {self.update_source}"
         ]
 
-    def write_config(self, config_writer: ConfigWriter):
+    def _open_neighbor(self, config_writer: ConfigWriter):
         config_writer.add_config(self._neighbor_header())
 
         config_writer.indent()
         config_writer.add_config(self._configure_neighbor_source())
-        for af in self.address_families:
-            config_writer.add_config(self._advertise_address_family(af))
-            config_writer.indent()
-            config_writer.unindent()
+
+    @staticmethod
+    def _write_address_family(config_writer: ConfigWriter, af: AddressFamily):
+        config_writer.add_config(BGPNeighbor._advertise_address_family(af))
+        config_writer.indent()
         config_writer.unindent()
 
+    @staticmethod
+    def _close_neighbor(config_writer: ConfigWriter):
+        config_writer.unindent()
+
+    def write_config(self, config_writer: ConfigWriter):
+        self._open_neighbor(config_writer)
+        for af in self.address_families:
+            self._write_address_family(config_writer, af)
+        self._close_neighbor(config_writer)
+
+    @classmethod
+    def compile_template(cls, indent: int = 1) -> Tuple[str, str, str]:
+        """
+        The opening lines with the neighbor, remote AS and update source as {0}, {1} and {2},
+        one address family block with the address family as {0}, and the closing line, at
+        the indent the neighbor has under router bgp.
+        """
+        placeholder = cls("{0}", "{1}", "{2}", [])
+        return (
+            ConfigWriter.capture(placeholder._open_neighbor, indent=indent),
+            ConfigWriter.capture(cls._write_address_family, "{0}", indent=indent + 1),
+            ConfigWriter.capture(cls._close_neighbor, indent=indent + 1)
+        )
+
+
+class PrefixRange:
+    """
+    Advertises every prefix of a loopback range in the given address families, producing
+    the networks lazily from the range.
+    """
+
+    def __init__(self, loopback_range: LoopbackRange, address_families: List[AddressFamily]) -> None:
+        self.loopback_range = loopback_range
+        self.address_families = address_families
+
+    def networks(self) -> Iterator[IPv4Network]:
+        for network in self.loopback_range.networks():
+            yield network.network
+
 
 class BGPNode:
     @staticmethod
@@ -47,6 +88,7 @@ class BGPNode:
         self.igp_node = igp_node
         self.asn = asn
         self.af_prefixes: List[Tuple[IPv4Interface, IPv4Network, List[AddressFamily]]] = []
+        self.prefix_ranges: List[PrefixRange] = []
         self.neighbors: List[BGPNeighbor] = []
 
     def _add_neighbor(self, identifier: IPv4Address, asn: int, address_families: List[AddressFamily]):
@@ -58,10 +100,27 @@ class BGPNode:
             )
         )
 
-    def _create_bgp_process(self, config_writer: ConfigWriter):
-        config_writer.add_config(f"router bgp {self.asn}")
+    @staticmethod
+    def _open_process(config_writer: ConfigWriter, asn: int, router_id: IPv4Address):
+        config_writer.line_return()
+        config_writer.add_config(f"router bgp {asn}")
+        config_writer.indent()
+        config_writer.add_config(f"bgp router-id {router_id}")
+
+    @staticmethod
+    def _open_address_family(config_writer: ConfigWriter, af: AddressFamily):
+        config_writer.add_config(BGPNode._advertise_address_family(af))
         config_writer.indent()
-        config_writer.add_config(f"bgp router-id {self.igp_node.data_node.identity}")
+
+    @staticmethod
+    def _write_networks(config_writer: ConfigWriter, networks: Iterable[IPv4Network]):
+        config_writer.add_config(
+            BGPNode._advertise_network(network) for network in networks
+        )
+
+    @staticmethod
+    def _close_section(config_writer: ConfigWriter):
+        config_writer.unindent()
 
     def _add_prefix(self, advertised_interface: IPv4Interface,
                     advertised_network: IPv4Network, af_list: List[AddressFamily]):
@@ -74,7 +133,19 @@ class BGPNode:
             (advertised_interface, advertised_network, af_list)
         )
 
-    def _get_af_classes(self) -> Dict[AddressFamily, List[IPv4Network]]:
+    def _add_prefix_range(self, base: IPv4Address, count: int, af_list: List[AddressFamily],
+                          prefix_len: int = 32) -> PrefixRange:
+        loopback_range = self.igp_node.data_node.create_loopback_range(
+            base, count, prefix_len,
+            description="BGP Reachable"
+        )
+
+        prefix_range = PrefixRange(loopback_range, af_list)
+        self.prefix_ranges.append(prefix_range)
+
+        return prefix_range
+
+    def _get_af_classes(self) -> Dict[AddressFamily, Iterable[IPv4Network]]:
         af_networks = {
             af: [] for af in AddressFamily.get_supported_address_families()
         }
@@ -83,29 +154,49 @@ class BGPNode:
             for af in address_families:
                 af_networks[af].append(network)
 
-        return af_networks
+        return {
+            af: itertools.chain(networks, *[
+                prefix_range.networks() for prefix_range in self.prefix_ranges
+                if af in prefix_range.address_families
+            ])
+            for af, networks in af_networks.items()
+        }
 
     def _advertise_prefixes(self, config_writer: ConfigWriter):
         af_networks = self._get_af_classes()
 
         for af, networks in af_networks.items():
-            config_writer.add_config(self._advertise_address_family(af))
-            config_writer.indent()
-            config_writer.add_config([
-                self._advertise_network(network) for network in networks
-            ])
-            config_writer.unindent()
+            self._open_address_family(config_writer, af)
+            self._write_networks(config_writer, networks)
+            self._close_section(config_writer)
 
     def _peer(self, config_writer: ConfigWriter):
         for neighbor in self.neighbors:
             neighbor.write_config(config_writer)
 
     def write_config(self, config_writer: ConfigWriter):
-        config_writer.line_return()
-        self._create_bgp_process(config_writer)
+        self._open_process(config_writer, self.asn, self.igp_node.data_node.identity)
         self._advertise_prefixes(config_writer)
         self._peer(config_writer)
-        config_writer.unindent()
+        self._close_section(config_writer)
+
+    @staticmethod
+    def compile_template() -> Tuple[str, Tuple[str, str, str], Tuple[str, str, str], str]:
+        """
+        The opening lines with the ASN and router ID as {0} and {1}; the opening line of an
+        address family with the address family as {0}, one network line with the network as
+        {0} and the closing line; the neighbor template; and the closing line of the process.
+        """
+        return (
+            ConfigWriter.capture(BGPNode._open_process, "{0}", "{1}"),
+            (
+                ConfigWriter.capture(BGPNode._open_address_family, "{0}", indent=1),
+                ConfigWriter.capture(BGPNode._write_networks, ["{0}"], indent=2),
+                ConfigWriter.capture(BGPNode._close_section, indent=2)
+            ),
+            BGPNeighbor.compile_template(indent=1),
+            ConfigWriter.capture(BGPNode._close_section, indent=1)
+        )
 
 
 class BGPTopology:
@@ -123,6 +214,41 @@ class BGPTopology:
             self.igp_topology.nodes[index], asn
         )
 
+    def _add_prefix_range(self, index: int, base: IPv4Address, count: int,
+                          af_list: List[AddressFamily], prefix_len: int = 32) -> PrefixRange:
+        return self.node_dict[index]._add_prefix_range(base, count, af_list, prefix_len)
+
+    def add_node(self, hostname: str, identifier: str, mgmt: str, *args) -> int:
+        return self.igp_topology.add_node(hostname, identifier, mgmt, *args)
+
+    def add_link(self, i: int, j: int, *args) -> int:
+        return self.igp_topology.add_link(i, j, *args)
+
+    def validate(self) -> List[TopologyConflict]:
+        return self.igp_topology.validate()
+
+    def _write_node(self, i: int, config_writer: ConfigWriter):
+        self.igp_topology._write_node(i, config_writer)
+        if i in self.node_dict:
+            self.node_dict[i].write_config(config_writer)
+
+    def render_writers(self, line_pool: LinePool = None) -> List[ConfigWriter]:
+        return self.igp_topology.point_to_point_topology._render_writers(self._write_node, line_pool)
+
+    def _render_node(self, i: int) -> str:
+        configs = self.igp_topology._render_node(i)
+        if i not in self.node_dict:
+            return configs
+
+        render_plan = self.igp_topology.point_to_point_topology.render_plan
+        if render_plan is not None:
+            return configs + render_plan.render_bgp_node(self.node_dict[i])
+
+        config_writer = ConfigWriter(self.igp_topology.nodes[i].data_node.hostname)
+        self.node_dict[i].write_config(config_writer)
+        config_writer.new_line()
+        return configs + config_writer.__str__()
+
     # def _add_peering(self, i, j, ):
 
 
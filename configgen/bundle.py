@@ -0,0 +1,148 @@
+import io
+import json
+import os.path
+import struct
+import tarfile
+import zipfile
+from typing import Dict, List, Tuple, Iterable
+from .constants import BundleFormat
+
+INDEXED_MAGIC = b"CFGBNDL1"
+
+INDEXED_FOOTER = struct.Struct("<Q8s")
+
+CONFIG_SUFFIX = ".conf"
+
+
+class ConfigBundleWriter:
+    """
+    Streams node configs into a single archive instead of one file per node.
+    The indexed format is the documents back to back, followed by a JSON index of
+    (offset, length) per hostname and a fixed size footer pointing at that index.
+    """
+
+    def __init__(self, path: str, bundle_format: BundleFormat = BundleFormat.INDEXED) -> None:
+        self.path = path
+        self.bundle_format = bundle_format
+        self.index: Dict[str, Tuple[int, int]] = {}
+
+        if bundle_format == BundleFormat.TAR:
+            self.archive = tarfile.open(path, "w")
+        elif bundle_format == BundleFormat.ZIP:
+            self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = open(path, "wb")
+
+    def add(self, hostname: str, configs: str):
+        data = configs.encode("utf-8")
+
+        if self.bundle_format == BundleFormat.TAR:
+            info = tarfile.TarInfo(hostname + CONFIG_SUFFIX)
+            info.size = len(data)
+            self.archive.addfile(info, io.BytesIO(data))
+        elif self.bundle_format == BundleFormat.ZIP:
+            self.archive.writestr(hostname + CONFIG_SUFFIX, data)
+        else:
+            self.index[hostname] = (self.archive.tell(), len(data))
+            self.archive.write(data)
+
+    def close(self):
+        if self.bundle_format == BundleFormat.INDEXED:
+            index_offset = self.archive.tell()
+            self.archive.write(json.dumps(self.index).encode("utf-8"))
+            self.archive.write(INDEXED_FOOTER.pack(index_offset, INDEXED_MAGIC))
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConfigBundle:
+    """
+    Random access reader over a config bundle. Only the index is loaded up front; each
+    host's config is read from its offset on demand.
+    """
+
+    @staticmethod
+    def _detect_format(path: str) -> BundleFormat:
+        if zipfile.is_zipfile(path):
+            return BundleFormat.ZIP
+
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() >= INDEXED_FOOTER.size:
+                f.seek(-INDEXED_FOOTER.size, os.SEEK_END)
+                if INDEXED_FOOTER.unpack(f.read())[1] == INDEXED_MAGIC:
+                    return BundleFormat.INDEXED
+
+        if tarfile.is_tarfile(path):
+            return BundleFormat.TAR
+
+        raise RuntimeError(f"{path} is not a config bundle")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.bundle_format = self._detect_format(path)
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.archive = None
+
+        if self.bundle_format == BundleFormat.ZIP:
+            self.archive = zipfile.ZipFile(path)
+            for name in self.archive.namelist():
+                if name.endswith(CONFIG_SUFFIX):
+                    self.index[name[:-len(CONFIG_SUFFIX)]] = (0, self.archive.getinfo(name).file_size)
+        elif self.bundle_format == BundleFormat.TAR:
+            with tarfile.open(path) as archive:
+                for info in archive:
+                    if info.isfile() and info.name.endswith(CONFIG_SUFFIX):
+                        self.index[info.name[:-len(CONFIG_SUFFIX)]] = (info.offset_data, info.size)
+        else:
+            with open(path, "rb") as f:
+                f.seek(-INDEXED_FOOTER.size, os.SEEK_END)
+                footer_offset = f.tell()
+                index_offset, _ = INDEXED_FOOTER.unpack(f.read())
+                f.seek(index_offset)
+                self.index = {
+                    hostname: tuple(entry)
+                    for hostname, entry in json.loads(f.read(footer_offset - index_offset)).items()
+                }
+
+    def hostnames(self) -> List[str]:
+        return list(self.index.keys())
+
+    def read(self, hostname: str) -> str:
+        if hostname not in self.index:
+            raise KeyError(f"Host {hostname} is not in bundle {self.path}")
+
+        if self.bundle_format == BundleFormat.ZIP:
+            return self.archive.read(hostname + CONFIG_SUFFIX).decode("utf-8")
+
+        offset, length = self.index[hostname]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length).decode("utf-8")
+
+    def close(self):
+        if self.archive:
+            self.archive.close()
+
+    def __contains__(self, hostname: str) -> bool:
+        return hostname in self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def write_bundle(path: str, rendered: Iterable[Tuple[str, str]],
+                 bundle_format: BundleFormat = BundleFormat.INDEXED) -> str:
+    with ConfigBundleWriter(path, bundle_format) as bundle_writer:
+        for hostname, configs in rendered:
+            bundle_writer.add(hostname, configs)
+
+    return path
@@ -1,29 +1,120 @@
 import os.path
 from .constants import INDENT, BREAK
-from typing import List, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Union
+
+
+class LinePool:
+    """
+    Canonical copies of rendered config lines and of closed nested config blocks. Writers
+    sharing a pool store a reference to the pooled line instead of their own copy, and a
+    nested block (header, children and closing "!") identical across writers, such as an
+    interface with its metrics under router isis, is stored once as a tuple and referenced
+    from each writer. With max_entries set, the pool stops growing once full and new
+    lines and blocks are kept by their writer only; clear() releases everything held.
+    """
+
+    def __init__(self, max_entries: int = None) -> None:
+        self.lines: Dict[str, str] = {}
+        self.blocks: Dict[tuple, tuple] = {}
+        self.max_entries = max_entries
+
+    def _is_full(self) -> bool:
+        return self.max_entries is not None and len(self.lines) + len(self.blocks) >= self.max_entries
+
+    def intern(self, line: str) -> str:
+        pooled = self.lines.get(line)
+        if pooled is not None:
+            return pooled
+        if self._is_full():
+            return line
+        self.lines[line] = line
+        return line
+
+    def intern_block(self, block: tuple) -> tuple:
+        pooled = self.blocks.get(block)
+        if pooled is not None:
+            return pooled
+        if self._is_full():
+            return block
+        self.blocks[block] = block
+        return block
+
+    def clear(self):
+        self.lines.clear()
+        self.blocks.clear()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+
+def _flatten(items: Iterable[Union[str, tuple]]) -> Iterator[str]:
+    for item in items:
+        if isinstance(item, tuple):
+            yield from _flatten(item)
+        else:
+            yield item
 
 
 class ConfigWriter:
-    def __init__(self, name: str) -> None:
+    """
+    Without a line pool the lines are stored flat. With a pool, every block nested in a top
+    level section is interned as a tuple of its items when unindent closes it, so the
+    private item list holds lines and pooled blocks. Top level sections mostly carry a
+    unique address or NET and stay flat. Either way lines() and config_lines give the flat
+    list of lines; with a pool it is built on each call.
+    """
+
+    @staticmethod
+    def capture(write: Callable[..., None], *args, indent: int = 0) -> str:
+        """
+        Runs one config section writer at the given indent and returns its text, which is how
+        the models compile their render templates from the same sections write_config uses.
+        """
+        config_writer = ConfigWriter("capture")
+        config_writer.current_indent = indent
+        write(config_writer, *args)
+        return "\n".join(config_writer.lines())
+
+    def __init__(self, name: str, line_pool: LinePool = None) -> None:
         self.name = name
-        self.config_lines = []
+        self._items: List[Union[str, tuple]] = []
         self.current_indent = 0
+        self.line_pool = line_pool
+        self.open_blocks: List[list] = [self._items]
+
+    def _line(self, config: str) -> str:
+        line = str(INDENT * self.current_indent) + config
+        if self.line_pool is not None:
+            return self.line_pool.intern(line)
+        return line
+
+    def _append(self, line: str):
+        self.open_blocks[-1].append(line)
 
     def indent(self):
+        if self.line_pool is not None:
+            parent = self.open_blocks[-1]
+            header = [parent.pop()] if parent and isinstance(parent[-1], str) else []
+            self.open_blocks.append(header)
         self.current_indent += 1
 
-    def add_config(self, configs: Union[str, List[str]]):
+    def add_config(self, configs: Union[str, Iterable[str]]):
         if isinstance(configs, str):
-            self.config_lines.append(str(INDENT * self.current_indent) + configs)
+            self._append(self._line(configs))
         else:
-            for config_str in list(configs):
+            for config_str in configs:
                 if config_str:
-                    self.config_lines.append(str(INDENT * self.current_indent) + config_str)
+                    self._append(self._line(config_str))
 
     def unindent(self):
         if self.current_indent > 0:
             self.current_indent -= 1
-            self.config_lines.append(str(INDENT * self.current_indent) + BREAK)
+            self._append(self._line(BREAK))
+            if self.line_pool is not None and len(self.open_blocks) > 2:
+                block = self.line_pool.intern_block(tuple(self.open_blocks.pop()))
+                self._append(block)
+            elif self.line_pool is not None and len(self.open_blocks) == 2:
+                self._items.extend(self.open_blocks.pop())
 
     def line_return(self):
         for _ in range(self.current_indent):
@@ -31,27 +122,39 @@ class ConfigWriter:
 
     def new_line(self):
         self.line_return()
-        self.config_lines.append("")
+        self._append("")
 
     def reset(self):
         self.current_indent = 0
-        self.config_lines.clear()
+        self._items.clear()
+        self.open_blocks = [self._items]
+
+    def lines(self) -> List[str]:
+        if self.line_pool is None:
+            return self._items
+        return list(_flatten(self.open_blocks[0])) + [
+            line for block in self.open_blocks[1:] for line in _flatten(block)
+        ]
+
+    @property
+    def config_lines(self) -> List[str]:
+        return self.lines()
 
     def write(self, path=None, append=False):
         if not path:
             if not append:
                 with open(self.name + ".conf", "w") as config_file:
-                    config_file.writelines('\n'.join(self.config_lines))
+                    config_file.writelines('\n'.join(self.lines()))
             else:
                 with open(self.name + ".conf", "a") as config_file:
-                    config_file.writelines('\n'.join(self.config_lines))
+                    config_file.writelines('\n'.join(self.lines()))
         else:
             if not append:
                 with open(os.path.join(path, self.name + ".conf"), "w") as config_file:
-                    config_file.writelines('\n'.join(self.config_lines))
+                    config_file.writelines('\n'.join(self.lines()))
             else:
                 with open(os.path.join(path, self.name + ".conf"), "a") as config_file:
-                    config_file.writelines('\n'.join(self.config_lines))
+                    config_file.writelines('\n'.join(self.lines()))
 
     def __str__(self) -> str:
-        return "\n".join(self.config_lines)
+        return "\n".join(self.lines())
@@ -14,9 +14,35 @@ MGMT_LINK_PREFIX = "MgmtEth 0/RP0/CPU0/"
 
 LOOPBACK_LINK_PREFIX = "Loopback "
 
-get_loopback = lambda n: LOOPBACK_LINK_PREFIX + str(n)
-get_data_link = lambda n: DATA_LINK_PREFIX + str(n)
-get_mgmt = lambda n: MGMT_LINK_PREFIX + str(0)
+MAX_LOOPBACK = 2 ** 31 - 1
+
+MGMT_LINK_NAME = MGMT_LINK_PREFIX + str(0)
+
+NAME_TABLE_SIZE = 1024
+
+ZERO_PADDED_OCTETS = [f"{octet:03d}" for octet in range(256)]
+
+
+class InterfaceNameTable:
+    """
+    Interface names of one kind, built once for the first NAME_TABLE_SIZE indices so that
+    nodes created in bulk look their names up instead of formatting them, and interfaces
+    with the same name share one string.
+    """
+
+    def __init__(self, prefix: str, size: int = NAME_TABLE_SIZE) -> None:
+        self.prefix = prefix
+        self.names = [prefix + str(n) for n in range(size)]
+
+    def __call__(self, n: int) -> str:
+        if 0 <= n < len(self.names):
+            return self.names[n]
+        return self.prefix + str(n)
+
+
+get_loopback = InterfaceNameTable(LOOPBACK_LINK_PREFIX)
+get_data_link = InterfaceNameTable(DATA_LINK_PREFIX)
+get_mgmt = lambda n: MGMT_LINK_NAME
 
 
 class StringValuedEnum(enum.Enum):
@@ -66,6 +92,23 @@ class AddressFamily(StringValuedEnum):
         ]
 
 
+class BundleFormat(StringValuedEnum):
+    TAR = "tar"
+    ZIP = "zip"
+    INDEXED = "cfgb"
+
+
+class ConflictKind(StringValuedEnum):
+    DUPLICATE_HOSTNAME = "duplicate-hostname"
+    DUPLICATE_IDENTITY = "duplicate-identity"
+    DUPLICATE_MGMT = "duplicate-management-address"
+    OVERLAPPING_SUBNET = "overlapping-link-subnet"
+    DUPLICATE_LINK = "duplicate-link"
+    SELF_LINK = "self-link"
+    UNKNOWN_NODE = "unknown-node"
+    DANGLING_LINK = "dangling-link"
+
+
 class ConfigKeys:
     CDP = "cdp"
     TELNET_MAX_SERVER = "telnet-max-server"
@@ -0,0 +1,220 @@
+import json
+import socket
+import socketserver
+import stat
+import threading
+from .point_to_point_topology import *
+from .validator import IncrementalValidator, TopologyValidationError
+
+
+def _get_point_to_point_topology(topology) -> PointToPointTopology:
+    while not isinstance(topology, PointToPointTopology):
+        topology = getattr(topology, "point_to_point_topology", None) or topology.igp_topology
+    return topology
+
+
+def _parse_af_metric_list(af_metric_list: List[list]) -> List[Tuple[AddressFamily, int]]:
+    return [(AddressFamily(af), int(metric)) for af, metric in af_metric_list]
+
+
+class _RenderRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                response = self.server.render_daemon.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class RenderDaemon:
+    """
+    Keeps a topology (point to point, ISIS or BGP) in memory and serves mutation and render
+    requests over a Unix socket, one JSON object per line. Mutations mark the touched nodes
+    dirty, and a write request only rewrites the config files of dirty nodes. The first
+    write validates the whole topology; later ones only check the nodes and links added
+    since the last clean write.
+    """
+
+    def __init__(self, topology, socket_path: str) -> None:
+        self.topology = topology
+        self.point_to_point_topology = _get_point_to_point_topology(topology)
+        self.socket_path = socket_path
+        self.dirty = set(range(len(self.point_to_point_topology.nodes)))
+        self.validator = IncrementalValidator(self.point_to_point_topology)
+        self.lock = threading.Lock()
+        self.server: socketserver.UnixStreamServer = None
+
+    def _resolve(self, node) -> int:
+        if isinstance(node, int):
+            return node
+
+        index = self.point_to_point_topology.get_node_index(node)
+        if index is None:
+            raise KeyError(f"Unknown host {node}")
+        return index
+
+    def _resolve_hosts(self, hosts: List = None) -> List[int]:
+        if hosts is None:
+            return list(range(len(self.point_to_point_topology.nodes)))
+        return [self._resolve(host) for host in hosts]
+
+    def _add_node(self, request: dict) -> dict:
+        args = [request["hostname"], request["identity"], request["mgmt"]]
+        if "identifier_metrics" in request:
+            args.append(_parse_af_metric_list(request["identifier_metrics"]))
+
+        i = self.topology.add_node(*args)
+        self.dirty.add(i)
+        return {"index": i}
+
+    def _add_link(self, request: dict) -> dict:
+        i, j = self._resolve(request["i"]), self._resolve(request["j"])
+        args = [i, j]
+        if "metrics" in request:
+            args.append(_parse_af_metric_list(request["metrics"]))
+            if "reverse_metrics" in request:
+                args.append(_parse_af_metric_list(request["reverse_metrics"]))
+
+        k = self.topology.add_link(*args)
+        self.dirty.update((i, j))
+        return {"link": k}
+
+    def _render(self, request: dict) -> dict:
+        return {"configs": {
+            self.point_to_point_topology.nodes[i].hostname: self.topology._render_node(i)
+            for i in self._resolve_hosts(request.get("hosts"))
+        }}
+
+    def _validate(self):
+        if self.validator.indexed:
+            conflicts = self.validator.validate_new()
+        else:
+            conflicts = self.topology.validate()
+            if not conflicts:
+                self.validator.index()
+
+        if conflicts:
+            raise TopologyValidationError(conflicts)
+
+    def _write(self, request: dict) -> dict:
+        if request.get("validate", True):
+            self._validate()
+
+        indices = sorted(self.dirty) if "hosts" not in request else self._resolve_hosts(request["hosts"])
+        path = self.point_to_point_topology.path
+        os.makedirs(path, exist_ok=True)
+
+        written = []
+        for i in indices:
+            hostname = self.point_to_point_topology.nodes[i].hostname
+            with open(os.path.join(path, f"{hostname}.conf"), "w") as config_file:
+                config_file.write(self.topology._render_node(i))
+            self.dirty.discard(i)
+            written.append(hostname)
+
+        return {"written": written}
+
+    def _status(self, request: dict) -> dict:
+        return {
+            "nodes": len(self.point_to_point_topology.nodes),
+            "links": len(self.point_to_point_topology.links),
+            "dirty": [self.point_to_point_topology.nodes[i].hostname for i in sorted(self.dirty)]
+        }
+
+    def _shutdown(self, request: dict) -> dict:
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+        return {}
+
+    def dispatch(self, request: dict) -> dict:
+        handlers = {
+            "add_node": self._add_node,
+            "add_link": self._add_link,
+            "render": self._render,
+            "write": self._write,
+            "status": self._status,
+            "shutdown": self._shutdown,
+        }
+
+        op = request.get("op")
+        if op not in handlers:
+            raise ValueError(f"Unknown operation {op}")
+
+        with self.lock:
+            response = handlers[op](request)
+        response["ok"] = True
+        return response
+
+    def _remove_stale_socket(self):
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{self.socket_path} exists and is not a socket")
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            os.remove(self.socket_path)
+            return
+        finally:
+            probe.close()
+
+        raise RuntimeError(f"Another daemon is serving on {self.socket_path}")
+
+    def _bind(self):
+        self._remove_stale_socket()
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, _RenderRequestHandler)
+        self.server.daemon_threads = True
+        self.server.render_daemon = self
+
+    def serve_forever(self):
+        if self.server is None:
+            self._bind()
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            os.remove(self.socket_path)
+
+    def start(self) -> threading.Thread:
+        self._bind()
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class RenderClient:
+    def __init__(self, socket_path: str) -> None:
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.stream = self.socket.makefile("rwb")
+
+    def request(self, op: str, **params) -> dict:
+        self.stream.write(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+        self.stream.flush()
+
+        response = json.loads(self.stream.readline())
+        if not response.pop("ok"):
+            raise RuntimeError(response["error"])
+        return response
+
+    def close(self):
+        self.stream.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
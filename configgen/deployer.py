@@ -2,9 +2,12 @@ import os
 import socket
 import telnetlib
 import time
-from getpass import getpass
-from typing import Dict, Tuple, List
-from constants import END
+from contextlib import contextmanager
+from typing import Dict, Tuple, List, Optional
+from .constants import END
+from .bundle import ConfigBundle
+from .inventory import Inventory, CredFileInventory, HostCreds
+from .session_pool import SessionPool, DEFAULT_POOL_SIZE, DEFAULT_IDLE_TIMEOUT
 
 
 class CleanTelnet(telnetlib.Telnet):
@@ -25,23 +28,6 @@ class CleanTelnet(telnetlib.Telnet):
         self.write(b"\n")
 
 
-class HostCreds:
-    @staticmethod
-    def add_cred(path: str, hostname: str):
-        user = input("Username: ")
-        # passwd = getpass("Password: ")
-        passwd = input("Password: ")
-        with open(os.path.join(path, f"{hostname}.cred"), "w") as cred_file:
-            cred_file.write(f"{user}:{passwd}")
-
-    @staticmethod
-    def get_cred(path: str, hostname: str) -> Tuple[str, str]:
-        with open(os.path.join(path, f"{hostname}.cred")) as cred_file:
-            user_pass = cred_file.read().split(":")
-
-        return user_pass[0], user_pass[1]
-
-
 class Deployer:
     DEFAULT_TIMEOUT = 2
 
@@ -97,100 +83,198 @@ class Deployer:
             f"{hostname}>"
         ]
 
-    def __init__(self, path: str, namespace: str, host_ports: Dict[str, int]):
+    @staticmethod
+    def _get_prompt_cases(hostname: str) -> List[str]:
+        return [f"{hostname}#", "ios#"]
+
+    def __init__(self, path: str, namespace: str = None, host_ports: Dict[str, int] = None,
+                 bundle: ConfigBundle = None, host_namespaces: Dict[str, str] = None,
+                 inventory: Inventory = None, session_pool: SessionPool = None):
+        if inventory is None:
+            if host_ports is None:
+                raise ValueError("Deployer needs either an inventory or host_ports")
+            inventory = CredFileInventory(path, namespace, host_ports, host_namespaces)
+
         self.path = path
         self.namespace = namespace
-        self.host_ports = host_ports
+        self.inventory = inventory
+        self.host_ports = inventory.host_ports()
+        self.bundle = bundle
+        self.host_namespaces = inventory.host_namespaces()
+        self.session_pool = session_pool
         self._check_topology()
 
-    def _push(self, hostname: str, t: CleanTelnet, user: str, passwd: str,
-              configs: str):
+    @classmethod
+    def from_topology(cls, point_to_point_topology, inventory: Inventory = None,
+                      bundle: ConfigBundle = None, session_pool: SessionPool = None) -> "Deployer":
+        if inventory is None:
+            inventory = point_to_point_topology.inventory
+        if inventory is None:
+            raise ValueError(f"Topology {point_to_point_topology.name} has no inventory")
+
+        return cls(point_to_point_topology.path, inventory=inventory.for_topology(point_to_point_topology),
+                   bundle=bundle, session_pool=session_pool)
+
+    def create_session_pool(self, max_size: int = DEFAULT_POOL_SIZE,
+                            idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                            borrow_timeout: float = None) -> SessionPool:
+        self.session_pool = SessionPool(self._open_session, max_size, idle_timeout, Deployer._get_prompt_cases,
+                                        borrow_timeout=borrow_timeout)
+        return self.session_pool
+
+    def _enter(self, hostname: str, t: CleanTelnet, user: str, passwd: str):
         print(f"Logging into host {hostname}")
         self._login(hostname, t, user, passwd)
-        self._write_config(hostname, t, configs)
 
-    def _cold_boot_configuration(self, hostname: str, t: CleanTelnet, user: str,
-                                 passwd: str, configs: str):
+    def _cold_boot_login(self, hostname: str, t: CleanTelnet, user: str, passwd: str):
         self._cold_boot(t, user, passwd)
-        self._push(hostname, t, user, passwd, configs)
+        self._enter(hostname, t, user, passwd)
 
-    def _idle_configuration(self, hostname: str, t: CleanTelnet, user: str,
-                            passwd: str, configs: str):
+    def _idle_login(self, hostname: str, t: CleanTelnet, user: str, passwd: str):
         self._from_idle(t)
-        self._push(hostname, t, user, passwd, configs)
+        self._enter(hostname, t, user, passwd)
 
-    def _handover_configuration(self, hostname: str, t: CleanTelnet, configs: str):
-        self._write_config(hostname, t, configs)
+    def get_namespace(self, hostname: str) -> str:
+        return self.host_namespaces.get(hostname, self.namespace)
+
+    def _get_config_hostnames(self) -> List[str]:
+        if self.bundle:
+            return self.bundle.hostnames()
+
+        return [
+            file_name.split(".conf")[0] for file_name in os.listdir(self.path)
+            if file_name.endswith(".conf")
+        ]
+
+    def _read_configs(self, hostname: str) -> str:
+        if self.bundle:
+            if hostname not in self.bundle:
+                raise RuntimeError(f"Host {hostname} is not in bundle {self.bundle.path}")
+            return self.bundle.read(hostname)
+
+        with open(os.path.join(self.path, f"{hostname}.conf"), "r") as config_file:
+            return config_file.read()
 
     def _check_topology(self):
-        for file_name in os.listdir(self.path):
-            if file_name.endswith(".conf"):
-                hostname = file_name.split(".conf")[0]
-                assert self.host_ports.__contains__(hostname), f"Host {hostname} not specified"
-
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                try:
-                    s.connect((self.namespace, self.host_ports[hostname]))
-                except socket.error as e:
-                    raise RuntimeError(f"Connection to remote host at "
-                                       f"{(self.namespace, self.host_ports[hostname])}"
-                                       "refused."
-                                       "Details:\n"
-                                       f"{e}")
-                finally:
-                    s.close()
+        for hostname in self._get_config_hostnames():
+            assert self.host_ports.__contains__(hostname), f"Host {hostname} not specified"
+
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                s.connect((self.get_namespace(hostname), self.host_ports[hostname]))
+            except socket.error as e:
+                raise RuntimeError(f"Connection to remote host at "
+                                   f"{(self.get_namespace(hostname), self.host_ports[hostname])}"
+                                   "refused."
+                                   "Details:\n"
+                                   f"{e}")
+            finally:
+                s.close()
 
         for hostname in self.host_ports.keys():
-            assert os.path.exists(os.path.join(
-                self.path, f"{hostname}.cred"
-            )), f"Host {hostname} has no matching credential file"
+            assert self.inventory.has_cred(hostname), f"Host {hostname} has no matching credentials"
 
         print("Topology data is OK")
 
-    def _negotiate_session(self, hostname: str, t: CleanTelnet, user: str, passwd: str,
-                           configs: str):
+    def _negotiate_login(self, hostname: str, t: CleanTelnet, user: str, passwd: str):
         idx, _, data = t.check_for(Deployer._get_initial_cases(hostname))
 
         if idx == 0:
-            self._cold_boot_configuration(hostname, t, user, passwd, configs)
+            self._cold_boot_login(hostname, t, user, passwd)
         elif idx == 1:
-            self._push(hostname, t, user, passwd, configs)
+            self._enter(hostname, t, user, passwd)
         elif idx == 2:
-            self._idle_configuration(hostname, t, user, passwd, configs)
+            self._idle_login(hostname, t, user, passwd)
         elif idx >= 3:
-            self._handover_configuration(hostname, t, configs)
+            return
         else:
             if len(data) == 0:
-                self._idle_configuration(hostname, t, user, passwd, configs)
+                self._idle_login(hostname, t, user, passwd)
             else:
                 t.close()
                 raise RuntimeError("Error while negotiating connection.\n"
                                    "Last input:\n"
                                    f"{data}")
 
+    def _negotiate_session(self, hostname: str, t: CleanTelnet, user: str, passwd: str,
+                           configs: str):
+        self._negotiate_login(hostname, t, user, passwd)
+        self._write_config(hostname, t, configs)
+
+    def _open_session(self, hostname: str, timeout: int = DEFAULT_TIMEOUT) -> CleanTelnet:
+        user, passwd = self.inventory.get_cred(hostname)
+
+        t = CleanTelnet(
+            host=self.get_namespace(hostname),
+            port=self.host_ports[hostname],
+            timeout=timeout
+        )
+        self._negotiate_login(hostname, t, user, passwd)
+
+        return t
+
+    @contextmanager
+    def session(self, hostname: str, timeout: int = DEFAULT_TIMEOUT):
+        if self.session_pool is None:
+            t = self._open_session(hostname, timeout)
+            try:
+                yield t
+            finally:
+                t.close()
+            return
+
+        with self.session_pool.session(hostname) as t:
+            pool_timeout, t.timeout = t.timeout, timeout
+            try:
+                yield t
+            finally:
+                t.timeout = pool_timeout
+
     def _start_session(self, hostname: str) -> Tuple[CleanTelnet, str, str, str]:
-        with open(os.path.join(self.path, f"{hostname}.conf"), "r") as config_file:
-            configs = config_file.read()
-        user, passwd = HostCreds.get_cred(self.path, hostname)
+        configs = self._read_configs(hostname)
+        user, passwd = self.inventory.get_cred(hostname)
 
         t = CleanTelnet(
-            host=self.namespace,
+            host=self.get_namespace(hostname),
             port=self.host_ports[hostname],
             timeout=Deployer.DEFAULT_TIMEOUT
         )
 
         return t, user, passwd, configs
 
+    def _deploy_pooled_host(self, hostname: str):
+        configs = self._read_configs(hostname)
+        with self.session_pool.session(hostname) as t:
+            self._write_config(hostname, t, configs)
+            t.input(END)
+
+        print(f"Session to {hostname} returned to the pool.")
+
     def _deploy_host(self, hostname: str):
+        if self.session_pool is not None:
+            self._deploy_pooled_host(hostname)
+            return
+
         t, user, passwd, configs = self._start_session(hostname)
         self._negotiate_session(hostname, t, user, passwd, configs)
         self._close_session(hostname, t)
 
-    def deploy(self):
+    def deploy_host(self, hostname: str) -> Optional[str]:
+        try:
+            self._deploy_host(hostname)
+        except (RuntimeError, OSError, EOFError) as e:
+            print(f"Failed to push configuration for host {hostname}\n."
+                  "Reason:\n"
+                  f"{e}")
+            return str(e)
+
+        return None
+
+    def deploy(self) -> Dict[str, str]:
+        failures: Dict[str, str] = {}
         for hostname in self.host_ports.keys():
-            try:
-                self._deploy_host(hostname)
-            except RuntimeError as e:
-                print(f"Failed to push configuration for host {hostname}\n."
-                      "Reason:\n"
-                      f"{e}")
+            error = self.deploy_host(hostname)
+            if error is not None:
+                failures[hostname] = error
+
+        return failures
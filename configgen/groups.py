@@ -0,0 +1,223 @@
+import re
+from typing import List, Dict, Tuple
+from .constants import INDENT, BREAK
+
+GROUP_PREFIX = "CG-"
+
+GROUP_START = "group "
+
+GROUP_END = "end-group"
+
+INTERFACE_PREFIX = "interface "
+
+
+class ConfigBlock:
+    def __init__(self, line: str, children: List["ConfigBlock"] = None) -> None:
+        self.line = line
+        self.children = children
+
+    def is_block(self) -> bool:
+        return self.children is not None
+
+    def lines(self, depth: int = 0) -> List[str]:
+        lines = [INDENT * depth + self.line]
+        if self.children is not None:
+            for child in self.children:
+                lines.extend(child.lines(depth + 1))
+            if depth == 0 and self.line.startswith(GROUP_START):
+                lines.append(GROUP_END)
+            else:
+                lines.append(INDENT * depth + BREAK)
+        return lines
+
+    def key(self) -> str:
+        return "\n".join(self.lines())
+
+
+class GroupReport:
+    def __init__(self, flat_bytes: int, grouped_bytes: int, groups: int) -> None:
+        self.flat_bytes = flat_bytes
+        self.grouped_bytes = grouped_bytes
+        self.groups = groups
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.flat_bytes - self.grouped_bytes
+
+    def __str__(self) -> str:
+        return (f"{self.flat_bytes} -> {self.grouped_bytes} bytes "
+                f"({self.saved_bytes} saved by {self.groups} group(s))")
+
+
+def _depth(line: str) -> int:
+    return len(line) - len(line.lstrip(INDENT))
+
+
+def parse_config(text: str) -> List[ConfigBlock]:
+    lines = text.split("\n")
+    root: List[ConfigBlock] = []
+    stack: List[Tuple[int, List[ConfigBlock]]] = [(-1, root)]
+
+    for position, line in enumerate(lines):
+        depth = _depth(line)
+        content = line[depth:]
+
+        if content in (BREAK, GROUP_END) and len(stack) > 1 and stack[-1][0] == depth:
+            stack.pop()
+            continue
+
+        block = ConfigBlock(content)
+        stack[-1][1].append(block)
+
+        if position + 1 < len(lines) and content:
+            next_line = lines[position + 1]
+            next_depth = _depth(next_line)
+            if next_depth > depth or (next_depth == depth and next_line[next_depth:] in (BREAK, GROUP_END)):
+                block.children = []
+                stack.append((depth, block.children))
+
+    return root
+
+
+def serialize_config(blocks: List[ConfigBlock]) -> str:
+    lines = []
+    for block in blocks:
+        lines.extend(block.lines())
+    return "\n".join(lines)
+
+
+class GroupCompressor:
+    """
+    Factors settings repeated across interfaces of the same kind into IOS XR groups. For
+    every configuration level, the children shared by all interfaces of one kind (for
+    example every GigabitEthernet under router isis) move into a group definition and the
+    interfaces reference it with apply-group. Each interface keeps its other settings, so
+    the resulting config expands to the flat one.
+    """
+
+    @staticmethod
+    def _interface_kind(block: ConfigBlock) -> str:
+        return block.line[len(INTERFACE_PREFIX):].split(" ")[0]
+
+    def __init__(self, min_interfaces: int = 2) -> None:
+        self.min_interfaces = min_interfaces
+
+    def _collect(self, blocks: List[ConfigBlock], ancestors: Tuple[str, ...],
+                 contexts: Dict[Tuple[Tuple[str, ...], str], List[ConfigBlock]]):
+        for block in blocks:
+            if not block.is_block():
+                continue
+
+            if block.line.startswith(INTERFACE_PREFIX):
+                contexts.setdefault((ancestors, self._interface_kind(block)), []).append(block)
+            else:
+                self._collect(block.children, ancestors + (block.line,), contexts)
+
+    @staticmethod
+    def _common_children(interfaces: List[ConfigBlock]) -> List[ConfigBlock]:
+        common = [child for child in interfaces[0].children]
+        for interface in interfaces[1:]:
+            keys = {child.key() for child in interface.children}
+            common = [child for child in common if child.key() in keys]
+        return common
+
+    @staticmethod
+    def _group_lines(name: str, ancestors: Tuple[str, ...], kind: str,
+                     children: List[ConfigBlock]) -> List[str]:
+        block = ConfigBlock(f"{INTERFACE_PREFIX}'{kind}.*'", list(children))
+        for ancestor in reversed(ancestors):
+            block = ConfigBlock(ancestor, [block])
+
+        return [f"{GROUP_START}{name}"] + block.lines(1) + [GROUP_END]
+
+    def compress(self, text: str) -> Tuple[str, GroupReport]:
+        blocks = parse_config(text)
+        contexts: Dict[Tuple[Tuple[str, ...], str], List[ConfigBlock]] = {}
+        self._collect(blocks, (), contexts)
+
+        definitions: List[str] = []
+        groups = 0
+        for (ancestors, kind), interfaces in contexts.items():
+            if len(interfaces) < self.min_interfaces:
+                continue
+
+            common = self._common_children(interfaces)
+            if not common:
+                continue
+
+            name = f"{GROUP_PREFIX}{groups + 1}"
+            apply_line = f"apply-group {name}"
+            group_lines = self._group_lines(name, ancestors, kind, common)
+            common_bytes = sum(len(line) + 1 for child in common for line in child.lines(len(ancestors) + 1))
+            apply_bytes = len(INDENT * (len(ancestors) + 1) + apply_line) + 1
+            group_bytes = sum(len(line) + 1 for line in group_lines)
+
+            if group_bytes + len(interfaces) * apply_bytes >= len(interfaces) * common_bytes:
+                continue
+
+            common_keys = {child.key() for child in common}
+            for interface in interfaces:
+                interface.children = [ConfigBlock(apply_line)] + [
+                    child for child in interface.children if child.key() not in common_keys
+                ]
+
+            definitions.extend(group_lines)
+            groups += 1
+
+        grouped = serialize_config(blocks)
+        if definitions:
+            grouped = "\n".join(definitions) + "\n" + grouped
+
+        return grouped, GroupReport(
+            len(text.encode("utf-8")), len(grouped.encode("utf-8")), groups
+        )
+
+
+def _find_group_interface(group: ConfigBlock, ancestors: Tuple[str, ...], name: str) -> ConfigBlock:
+    blocks = group.children
+    for ancestor in ancestors:
+        blocks = next((block.children for block in blocks if block.line == ancestor and block.is_block()), [])
+
+    for block in blocks:
+        if block.is_block() and block.line.startswith(INTERFACE_PREFIX):
+            pattern = block.line[len(INTERFACE_PREFIX):].strip("'")
+            if re.fullmatch(pattern, name):
+                return block
+    return None
+
+
+def _expand_blocks(blocks: List[ConfigBlock], ancestors: Tuple[str, ...], groups: Dict[str, ConfigBlock]):
+    for block in blocks:
+        if not block.is_block():
+            continue
+
+        if block.line.startswith(INTERFACE_PREFIX):
+            name = block.line[len(INTERFACE_PREFIX):]
+            children = []
+            for child in block.children:
+                if child.is_block() or not child.line.startswith("apply-group "):
+                    children.append(child)
+                    continue
+
+                inherited = _find_group_interface(groups[child.line.split(" ", 1)[1]], ancestors, name)
+                if inherited:
+                    keys = {other.key() for other in block.children}
+                    children.extend(other for other in inherited.children if other.key() not in keys)
+            block.children = children
+        else:
+            _expand_blocks(block.children, ancestors + (block.line,), groups)
+
+
+def expand_groups(text: str) -> str:
+    """
+    Inlines the interface level apply-group references of a config produced by
+    GroupCompressor and drops the group definitions.
+    """
+    blocks = parse_config(text)
+    groups = {
+        block.line[len(GROUP_START):]: block for block in blocks
+        if block.is_block() and block.line.startswith(GROUP_START)
+    }
+    blocks = [block for block in blocks if not (block.is_block() and block.line.startswith(GROUP_START))]
+    _expand_blocks(blocks, (), groups)
+    return serialize_config(blocks)
@@ -0,0 +1,139 @@
+import csv
+import os.path
+from typing import Dict, List, Tuple, Iterable
+
+INVENTORY_FIELDS = ["hostname", "namespace", "port", "user", "password"]
+
+CREDENTIAL_FIELDS = {"user", "password"}
+
+
+class HostCreds:
+    @staticmethod
+    def cred_file(path: str, hostname: str) -> str:
+        return os.path.join(path, f"{hostname}.cred")
+
+    @staticmethod
+    def add_cred(path: str, hostname: str):
+        user = input("Username: ")
+        # passwd = getpass("Password: ")
+        passwd = input("Password: ")
+        with open(HostCreds.cred_file(path, hostname), "w") as cred_file:
+            cred_file.write(f"{user}:{passwd}")
+
+    @staticmethod
+    def get_cred(path: str, hostname: str) -> Tuple[str, str]:
+        with open(HostCreds.cred_file(path, hostname)) as cred_file:
+            user_pass = cred_file.read().split(":")
+
+        return user_pass[0], user_pass[1]
+
+
+class InventoryEntry:
+    def __init__(self, hostname: str, namespace: str, port: int, user: str = None,
+                 passwd: str = None) -> None:
+        self.hostname = hostname
+        self.namespace = namespace
+        self.port = int(port)
+        self.user = user
+        self.passwd = passwd
+
+    def to_row(self) -> List:
+        return [self.hostname, self.namespace, self.port, self.user, self.passwd]
+
+
+class Inventory:
+    """
+    Hostname, terminal server namespace, port and credentials of every host, loaded once
+    from a single CSV file and indexed by hostname.
+    """
+
+    @classmethod
+    def load(cls, path: str) -> "Inventory":
+        with open(path, newline="") as inventory_file:
+            return cls.from_rows(
+                [cls._load_field(row, field) for field in INVENTORY_FIELDS]
+                for row in csv.DictReader(inventory_file)
+            )
+
+    @staticmethod
+    def _load_field(row: Dict[str, str], field: str) -> str:
+        if field in CREDENTIAL_FIELDS and not row[field]:
+            return None
+        return row[field]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[List]) -> "Inventory":
+        return cls([InventoryEntry(*row) for row in rows])
+
+    def __init__(self, entries: List[InventoryEntry] = None) -> None:
+        self.entries: Dict[str, InventoryEntry] = {}
+        for entry in entries or []:
+            assert entry.hostname not in self.entries, f"Host {entry.hostname} is listed twice"
+            self.entries[entry.hostname] = entry
+
+    def save(self, path: str):
+        with open(path, "w", newline="") as inventory_file:
+            writer = csv.writer(inventory_file)
+            writer.writerow(INVENTORY_FIELDS)
+            writer.writerows(self.to_rows())
+
+    def to_rows(self) -> List[List]:
+        return [entry.to_row() for entry in self.entries.values()]
+
+    def get_entry(self, hostname: str) -> InventoryEntry:
+        return self.entries[hostname]
+
+    def has_cred(self, hostname: str) -> bool:
+        entry = self.entries.get(hostname)
+        return entry is not None and entry.user is not None and entry.passwd is not None
+
+    def get_cred(self, hostname: str) -> Tuple[str, str]:
+        entry = self.entries[hostname]
+        return entry.user, entry.passwd
+
+    def host_ports(self) -> Dict[str, int]:
+        return {hostname: entry.port for hostname, entry in self.entries.items()}
+
+    def host_namespaces(self) -> Dict[str, str]:
+        return {hostname: entry.namespace for hostname, entry in self.entries.items()}
+
+    def subset(self, hostnames: Iterable[str]) -> "Inventory":
+        return Inventory([self.entries[hostname] for hostname in hostnames])
+
+    def for_topology(self, point_to_point_topology) -> "Inventory":
+        hostnames = [node.hostname for node in point_to_point_topology.nodes]
+        missing = [hostname for hostname in hostnames if hostname not in self.entries]
+        assert not missing, f"Hosts {missing} are not in the inventory"
+        return self.subset(hostnames)
+
+    def __contains__(self, hostname: str) -> bool:
+        return hostname in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class CredFileInventory(Inventory):
+    """
+    The per host layout: ports and namespaces given by hand and credentials in a
+    <hostname>.cred file next to the configs, read when first needed.
+    """
+
+    def __init__(self, path: str, namespace: str, host_ports: Dict[str, int],
+                 host_namespaces: Dict[str, str] = None) -> None:
+        host_namespaces = host_namespaces or {}
+        super().__init__([
+            InventoryEntry(hostname, host_namespaces.get(hostname, namespace), port)
+            for hostname, port in host_ports.items()
+        ])
+        self.path = path
+
+    def has_cred(self, hostname: str) -> bool:
+        return os.path.exists(HostCreds.cred_file(self.path, hostname))
+
+    def get_cred(self, hostname: str) -> Tuple[str, str]:
+        entry = self.entries[hostname]
+        if entry.user is None:
+            entry.user, entry.passwd = HostCreds.get_cred(self.path, hostname)
+
+        return entry.user, entry.passwd
@@ -1,7 +1,72 @@
-import textwrap
+from array import array
+from typing import Iterable, Iterator, Sequence
 from .point_to_point_topology import *
 
 
+class LinkMetricMatrix:
+    """
+    Per address family metrics aligned with the link table of a point to point topology.
+    Entry k holds the metric of link k in both directions; directions that differ are kept
+    as sparse overrides. Any integer sequence works as a column, NumPy arrays included.
+    """
+
+    def __init__(self, link_count: int, address_families: List[AddressFamily],
+                 default_metric: int = 10) -> None:
+        self.link_count = link_count
+        self.address_families = list(address_families)
+        self.metrics: Dict[AddressFamily, Sequence[int]] = {
+            af: array("l", [default_metric]) * link_count for af in self.address_families
+        }
+        self.forward_overrides: Dict[AddressFamily, Dict[int, int]] = {af: {} for af in self.address_families}
+        self.reverse_overrides: Dict[AddressFamily, Dict[int, int]] = {af: {} for af in self.address_families}
+
+    @classmethod
+    def from_arrays(cls, metrics: Dict[AddressFamily, Sequence[int]]) -> "LinkMetricMatrix":
+        lengths = {len(column) for column in metrics.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Metric arrays have different lengths: {sorted(lengths)}")
+
+        matrix = cls(lengths.pop() if lengths else 0, list(metrics.keys()))
+        matrix.metrics = dict(metrics)
+        return matrix
+
+    def set_metric(self, af: AddressFamily, k: int, metric: int, reverse_metric: int = None):
+        self.metrics[af][k] = metric
+        self.forward_overrides[af].pop(k, None)
+        if reverse_metric is None:
+            self.reverse_overrides[af].pop(k, None)
+        else:
+            self.reverse_overrides[af][k] = reverse_metric
+
+    def set_direction_metric(self, af: AddressFamily, k: int, reverse: bool, metric: int):
+        overrides = self.reverse_overrides if reverse else self.forward_overrides
+        overrides[af][k] = metric
+
+    def get_metric(self, af: AddressFamily, k: int, reverse: bool = False) -> int:
+        overrides = self.reverse_overrides if reverse else self.forward_overrides
+        return int(overrides[af].get(k, self.metrics[af][k]))
+
+    def iter_metrics(self, k: int, reverse: bool = False) -> Iterator[Tuple[AddressFamily, int]]:
+        for af in self.address_families:
+            yield af, self.get_metric(af, k, reverse)
+
+
+class LinkMetricView:
+    """
+    Iterates the (address family, metric) pairs of one direction of a link straight from a
+    LinkMetricMatrix, standing in for a per interface tuple list.
+    """
+    __slots__ = ("matrix", "link", "reverse")
+
+    def __init__(self, matrix: LinkMetricMatrix, link: int, reverse: bool) -> None:
+        self.matrix = matrix
+        self.link = link
+        self.reverse = reverse
+
+    def __iter__(self) -> Iterator[Tuple[AddressFamily, int]]:
+        return self.matrix.iter_metrics(self.link, self.reverse)
+
+
 class ISISInterface:
     @staticmethod
     def _advertise_address_family(af: AddressFamily) -> str:
@@ -11,48 +76,54 @@ class ISISInterface:
     def _configure_address_family_metric(metric: int) -> str:
         return f"metric {metric}"
 
-    def __init__(self, node_interface: NodeInterface, af_metric_list: List[Tuple[AddressFamily, int]]):
+    def __init__(self, node_interface: NodeInterface, af_metric_list: Iterable[Tuple[AddressFamily, int]]):
         self.node_interface = node_interface
         self.af_metric_list = af_metric_list
 
-    def _configure_loopback_interface(self, config_writer: ConfigWriter):
-        config_writer.add_config(f"interface {self.node_interface.name}")
-
-        config_writer.indent()
-        config_writer.add_config("passive")
-
-        for af, metric in self.af_metric_list:
-            config_writer.add_config(self._advertise_address_family(af))
-            config_writer.indent()
-            config_writer.add_config(self._configure_address_family_metric(metric))
-            config_writer.unindent()
-
-        config_writer.unindent()
+    def _interface_mode(self) -> str:
+        if self.node_interface.type == InterfaceTypes.LOOPBACK:
+            return "passive"
+        return "point-to-point"
 
-    def _configure_data_interface(self, config_writer: ConfigWriter):
+    def _open_interface(self, config_writer: ConfigWriter):
         config_writer.add_config(f"interface {self.node_interface.name}")
 
         config_writer.indent()
-        config_writer.add_config("point-to-point")
+        config_writer.add_config(self._interface_mode())
 
-        for af, metric in self.af_metric_list:
-            config_writer.add_config(self._advertise_address_family(af))
-            config_writer.indent()
-            config_writer.add_config(self._configure_address_family_metric(metric))
-            config_writer.unindent()
+    @staticmethod
+    def _write_address_family(config_writer: ConfigWriter, af: AddressFamily, metric: int):
+        config_writer.add_config(ISISInterface._advertise_address_family(af))
+        config_writer.indent()
+        config_writer.add_config(ISISInterface._configure_address_family_metric(metric))
+        config_writer.unindent()
 
+    @staticmethod
+    def _close_interface(config_writer: ConfigWriter):
         config_writer.unindent()
 
     def write_config(self, config_writer: ConfigWriter):
         if self.node_interface.type == InterfaceTypes.MGMT:
             return
 
-        if self.node_interface.type == InterfaceTypes.LOOPBACK:
-            self._configure_loopback_interface(config_writer)
-        elif self.node_interface.type == InterfaceTypes.DATA:
-            self._configure_data_interface(config_writer)
-
-        # config_writer.unindent()
+        self._open_interface(config_writer)
+        for af, metric in self.af_metric_list:
+            self._write_address_family(config_writer, af, metric)
+        self._close_interface(config_writer)
+
+    @classmethod
+    def compile_template(cls, interface_type: InterfaceTypes, indent: int = 1) -> Tuple[str, str, str]:
+        """
+        The opening lines with the interface name as {0}, one address family block with the
+        address family and metric as {0} and {1}, and the closing line, at the indent the
+        interface has under router isis.
+        """
+        placeholder = cls(NodeInterface(interface_type, "{0}", None), [])
+        return (
+            ConfigWriter.capture(placeholder._open_interface, indent=indent),
+            ConfigWriter.capture(cls._write_address_family, "{0}", "{1}", indent=indent + 1),
+            ConfigWriter.capture(cls._close_interface, indent=indent + 1)
+        )
 
 
 class ISISNode:
@@ -60,59 +131,87 @@ class ISISNode:
     def _zero_pad_octet(octet: str) -> str:
         return (3 - len(octet)) * "0" + octet
 
+    @staticmethod
+    def _system_id(identity: Union[IPv4Address, IPv4Interface]) -> str:
+        if isinstance(identity, IPv4Address) and not isinstance(identity, IPv4Interface):
+            ip = int(identity)
+            digits = (ZERO_PADDED_OCTETS[ip >> 24] + ZERO_PADDED_OCTETS[ip >> 16 & 255] +
+                      ZERO_PADDED_OCTETS[ip >> 8 & 255] + ZERO_PADDED_OCTETS[ip & 255])
+        else:
+            digits = "".join(ISISNode._zero_pad_octet(octet) for octet in str(identity).split("."))
+
+        return ".".join(digits[position:position + 4] for position in range(0, len(digits), 4))
+
+    @staticmethod
+    def generate_net_ids(identities: Iterable[Union[IPv4Address, IPv4Interface]],
+                         config: dict = DEFAULT_CONFIGS) -> List[str]:
+        prefix = f"{config[ConfigKeys.DEFAULT_ISIS_AFI]}.{config[ConfigKeys.DEFAULT_ISIS_AREA_NUM]}."
+        suffix = f".{config[ConfigKeys.DEFAULT_ISIS_SELECTOR]}"
+        return [prefix + ISISNode._system_id(identity) + suffix for identity in identities]
+
     def __init__(self, data_node: DataNode, is_level: ISLevel, process_name: str,
-                 config: dict = DEFAULT_CONFIGS) -> None:
+                 config: dict = DEFAULT_CONFIGS, net_id: str = None) -> None:
         self.data_node = data_node
         self.config = config
-        self.net_id = self._generate_net_id()
+        self.net_id = net_id if net_id is not None else self._generate_net_id()
         self.is_level = is_level
         self.process_name = process_name
         self.interfaces: List[ISISInterface] = []
 
     def _generate_net_id(self) -> str:
-        octets = [ISISNode._zero_pad_octet(octet) for octet in str(self.data_node.identity).split(".")]
-        net_parts = textwrap.wrap("".join(octets), 4)
-        return ".".join([
-            self.config[ConfigKeys.DEFAULT_ISIS_AFI],
-            self.config[ConfigKeys.DEFAULT_ISIS_AREA_NUM],
-            *net_parts,
-            self.config[ConfigKeys.DEFAULT_ISIS_SELECTOR]
-        ])
+        return ISISNode.generate_net_ids([self.data_node.identity], self.config)[0]
 
-    def _create_isis_process(self) -> str:
-        return f"router isis {self.process_name}"
+    @staticmethod
+    def _open_process(config_writer: ConfigWriter, process_name: str, is_level: ISLevel, net_id: str,
+                      address_families: List[AddressFamily]):
+        config_writer.line_return()
+        config_writer.add_config(f"router isis {process_name}")
 
-    def _configure_isis_process(self) -> List[str]:
-        return [
-            f"is-type {self.is_level}",
-            f"net {self.net_id}"
-        ]
+        config_writer.indent()
+        config_writer.add_config([
+            f"is-type {is_level}",
+            f"net {net_id}"
+        ])
 
-    def _configure_process_address_family(self, config_writer: ConfigWriter):
-        for af in self.config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES]:
+        for af in address_families:
             config_writer.add_config(f"address-family {af}")
 
             config_writer.indent()
             config_writer.add_config(f"metric-style wide")
             config_writer.unindent()
 
-    def create_new_isis_link(self, interface: NodeInterface, af_metric_list: List[Tuple[AddressFamily, int]]):
+    @staticmethod
+    def _close_process(config_writer: ConfigWriter):
+        config_writer.unindent()
+
+    def create_new_isis_link(self, interface: NodeInterface, af_metric_list: Iterable[Tuple[AddressFamily, int]]):
         self.interfaces.append(ISISInterface(interface, af_metric_list))
 
+    def create_new_isis_matrix_link(self, interface: NodeInterface, metric_matrix: LinkMetricMatrix,
+                                    link: int, reverse: bool = False):
+        self.create_new_isis_link(interface, LinkMetricView(metric_matrix, link, reverse))
+
     def create_isis_identifier_link(self, af_metric_list: List[Tuple[AddressFamily, int]]):
         self.interfaces.append(ISISInterface(self.data_node.identity_interface, af_metric_list))
 
     def write_config(self, config_writer: ConfigWriter):
-        config_writer.line_return()
-        config_writer.add_config(self._create_isis_process())
-
-        config_writer.indent()
-        config_writer.add_config(self._configure_isis_process())
-        self._configure_process_address_family(config_writer)
+        self._open_process(config_writer, self.process_name, self.is_level, self.net_id,
+                           self.config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES])
 
         for interface in self.interfaces:
             interface.write_config(config_writer)
-        config_writer.unindent()
+        self._close_process(config_writer)
+
+    @staticmethod
+    def compile_template(address_families: List[AddressFamily]) -> Tuple[str, str]:
+        """
+        The lines written before the interfaces, with the process name, IS level and NET as
+        {0}, {1} and {2}, and the closing line written after them.
+        """
+        return (
+            ConfigWriter.capture(ISISNode._open_process, "{0}", "{1}", "{2}", address_families),
+            ConfigWriter.capture(ISISNode._close_process, indent=1)
+        )
 
 
 class ISISTopology:
@@ -122,9 +221,12 @@ class ISISTopology:
         self.config = config
         self.process_name = process_name
         self.is_level = config[ConfigKeys.IS_LEVEL]
+        net_ids = ISISNode.generate_net_ids(
+            (data_node.identity for data_node in self.point_to_point_topology.nodes), config
+        )
         self.nodes = [
-            ISISNode(data_node, self.is_level, self.process_name, config)
-            for data_node in self.point_to_point_topology.nodes
+            ISISNode(data_node, self.is_level, self.process_name, config, net_id)
+            for data_node, net_id in zip(self.point_to_point_topology.nodes, net_ids)
         ]
         self.af_metric_descriptor: Dict[
             Tuple[int, int],
@@ -135,11 +237,31 @@ class ISISTopology:
             int, List[Tuple[AddressFamily, int]]
         ] = dict()
 
+        self.metric_matrix: LinkMetricMatrix = None
+
+    def create_metric_matrix(self, default_metric: int = 10) -> LinkMetricMatrix:
+        return LinkMetricMatrix(
+            len(self.point_to_point_topology.links),
+            self.config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES],
+            default_metric
+        )
+
+    def get_node(self, hostname: str) -> ISISNode:
+        index = self.point_to_point_topology.get_node_index(hostname)
+        return self.nodes[index] if index is not None else None
+
     def _add_link(self, i, j, af_metric_list: List[Tuple[AddressFamily, int]]):
         transmit_interface = self.\
             point_to_point_topology.\
             get_transmit_data_interface(i, j)
 
+        if transmit_interface is None:
+            raise TopologyValidationError([TopologyConflict(
+                ConflictKind.DANGLING_LINK,
+                f"ISIS link ({i}, {j}) has no matching data link",
+                nodes=[i, j], links=[(i, j)]
+            )])
+
         self.nodes[i].create_new_isis_link(transmit_interface, af_metric_list)
 
     def _up_identifier_links(self, identifier_af_metric_descriptor: Dict[
@@ -148,22 +270,106 @@ class ISISTopology:
         for i, af_metric_list in identifier_af_metric_descriptor.items():
             self.nodes[i].create_isis_identifier_link(af_metric_list)
 
+    def add_node(self, hostname: str, identifier: str, mgmt: str,
+                 identifier_af_metric_list: List[Tuple[AddressFamily, int]] = None) -> int:
+        i = self.point_to_point_topology.add_node(hostname, identifier, mgmt)
+        self.nodes.append(ISISNode(
+            self.point_to_point_topology.nodes[i], self.is_level, self.process_name, self.config
+        ))
+
+        if identifier_af_metric_list:
+            self.identifier_af_metric_descriptor[i] = identifier_af_metric_list
+            self.nodes[i].create_isis_identifier_link(identifier_af_metric_list)
+
+        return i
+
+    def add_link(self, i: int, j: int, af_metric_list: List[Tuple[AddressFamily, int]],
+                 reverse_af_metric_list: List[Tuple[AddressFamily, int]] = None) -> int:
+        k = self.point_to_point_topology.add_link(i, j)
+
+        for (a, b), metrics in (((i, j), af_metric_list), ((j, i), reverse_af_metric_list or af_metric_list)):
+            self.af_metric_descriptor[(a, b)] = metrics
+            self._add_link(a, b, metrics)
+
+        return k
+
     def generate_isis_topology(self, af_metric_descriptor: Dict[
         Tuple[int, int],
         List[Tuple[AddressFamily, int]]
     ], identifier_af_metric_descriptor: Dict[
         int, List[Tuple[AddressFamily, int]]
     ]):
+        TopologyValidator(self.point_to_point_topology).check_descriptors(
+            af_metric_descriptor, identifier_af_metric_descriptor
+        )
+
         self.af_metric_descriptor = af_metric_descriptor
         self.identifier_af_metric_descriptor = identifier_af_metric_descriptor
         self._up_identifier_links(identifier_af_metric_descriptor)
         for i, j in af_metric_descriptor.keys():
             self._add_link(i, j, af_metric_descriptor[(i, j)])
 
-    def write_config(self):
-        self.point_to_point_topology.write_config()
-        for node in self.nodes:
-            config_writer = ConfigWriter(node.data_node.hostname)
-            node.write_config(config_writer)
-            config_writer.new_line()
-            config_writer.write(self.point_to_point_topology.path, append=True)
+    def validate(self) -> List[TopologyConflict]:
+        return TopologyValidator(self.point_to_point_topology).validate(
+            self.af_metric_descriptor, self.identifier_af_metric_descriptor
+        )
+
+    def generate_isis_topology_from_matrix(self, metric_matrix: LinkMetricMatrix,
+                                           identifier_af_metric_descriptor: Dict[
+                                               int, List[Tuple[AddressFamily, int]]
+                                           ]):
+        assert metric_matrix.link_count == len(self.point_to_point_topology.links), \
+            "Metric matrix is not aligned with the link table"
+
+        self.metric_matrix = metric_matrix
+        self.identifier_af_metric_descriptor = identifier_af_metric_descriptor
+        self._up_identifier_links(identifier_af_metric_descriptor)
+        for k, (i, j) in enumerate(self.point_to_point_topology.links):
+            self.nodes[i].create_new_isis_matrix_link(
+                self.point_to_point_topology.get_transmit_data_interface(i, j), metric_matrix, k
+            )
+            self.nodes[j].create_new_isis_matrix_link(
+                self.point_to_point_topology.get_transmit_data_interface(j, i), metric_matrix, k, reverse=True
+            )
+
+    def _write_node(self, i: int, config_writer: ConfigWriter):
+        self.point_to_point_topology._write_node(i, config_writer)
+        self.nodes[i].write_config(config_writer)
+
+    def render_writers(self, line_pool: LinePool = None) -> List[ConfigWriter]:
+        return self.point_to_point_topology._render_writers(self._write_node, line_pool)
+
+    def _render_node(self, i: int) -> str:
+        render_plan = self.point_to_point_topology.render_plan
+        if render_plan is not None:
+            return render_plan.render_data_node(self.nodes[i].data_node) + render_plan.render_isis_node(self.nodes[i])
+
+        config_writer = ConfigWriter(self.nodes[i].data_node.hostname)
+        self.nodes[i].write_config(config_writer)
+        config_writer.new_line()
+        return self.point_to_point_topology._render_node(i) + config_writer.__str__()
+
+    def write_bundle(self, bundle_format: BundleFormat = BundleFormat.INDEXED,
+                     validate: bool = True) -> str:
+        if validate:
+            TopologyValidator(self.point_to_point_topology).check(
+                self.af_metric_descriptor, self.identifier_af_metric_descriptor
+            )
+
+        return write_bundle(self.point_to_point_topology._get_bundle_path(bundle_format), (
+            (node.data_node.hostname, self._render_node(i)) for i, node in enumerate(self.nodes)
+        ), bundle_format)
+
+    def write_config(self, validate: bool = True, grouped: bool = False) -> Optional[Dict[str, GroupReport]]:
+        if validate:
+            TopologyValidator(self.point_to_point_topology).check(
+                self.af_metric_descriptor, self.identifier_af_metric_descriptor
+            )
+
+        if grouped:
+            return self.point_to_point_topology._write_grouped_config(self._render_node)
+
+        os.makedirs(self.point_to_point_topology.path, exist_ok=True)
+        for i, node in enumerate(self.nodes):
+            with open(os.path.join(self.point_to_point_topology.path, f"{node.data_node.hostname}.conf"), "w") as config_file:
+                config_file.write(self._render_node(i))
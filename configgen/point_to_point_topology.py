@@ -1,9 +1,13 @@
 import os.path
 from ipaddress import ip_network
 from ipaddress import IPv4Address, IPv4Interface, IPv4Network
-from typing import List, Union, Tuple, Dict
-from .config_writer import ConfigWriter
+from typing import List, Union, Tuple, Dict, Iterator, Callable, Optional
+from .config_writer import ConfigWriter, LinePool
 from .constants import *
+from .validator import TopologyValidator, TopologyConflict, TopologyValidationError
+from .bundle import write_bundle
+from .groups import GroupCompressor, GroupReport
+from .inventory import Inventory
 
 
 class NodeInterface:
@@ -53,6 +57,56 @@ class NodeInterface:
         config_writer.add_config(self._assign_ipv4_address())
         config_writer.unindent()
 
+    @classmethod
+    def compile_template(cls, interface_type: InterfaceTypes, description: bool, cdp: bool) -> str:
+        """
+        The config of one interface with its name, description and address as {0}, {1} and {2}.
+        """
+        placeholder = cls(interface_type, "{0}", "{2}", cdp=cdp, description="{1}" if description else None)
+        return ConfigWriter.capture(placeholder.write_config)
+
+
+class LoopbackRange:
+    """
+    A block of consecutive loopbacks holding consecutive equally sized prefixes. Only the
+    description of the block is stored; the interfaces are generated while rendering.
+    """
+
+    def __init__(self, first_loopback: int, base: IPv4Address, count: int, prefix_len: int = 32,
+                 description: str = None) -> None:
+        self.first_loopback = first_loopback
+        self.base = IPv4Address(base)
+        self.count = count
+        self.prefix_len = prefix_len
+        self.description = description
+
+    def networks(self) -> Iterator[IPv4Interface]:
+        base = int(self.base)
+        step = 1 << (32 - self.prefix_len)
+        for k in range(self.count):
+            yield IPv4Interface((base + k * step, self.prefix_len))
+
+    def interfaces(self) -> Iterator[NodeInterface]:
+        for k, network in enumerate(self.networks()):
+            yield NodeInterface(
+                InterfaceTypes.LOOPBACK,
+                get_loopback(self.first_loopback + k),
+                network,
+                description=self.description
+            )
+
+    def get_interface(self, loopback: int) -> Optional[NodeInterface]:
+        k = loopback - self.first_loopback
+        if not 0 <= k < self.count:
+            return None
+
+        network = IPv4Interface((int(self.base) + (k << (32 - self.prefix_len)), self.prefix_len))
+        return NodeInterface(InterfaceTypes.LOOPBACK, get_loopback(loopback), network, description=self.description)
+
+    def write_config(self, config_writer: ConfigWriter):
+        for interface in self.interfaces():
+            interface.write_config(config_writer)
+
 
 class DataNode:
     @staticmethod
@@ -66,28 +120,60 @@ class DataNode:
         self.next_loopback = 0
         self.next_data = 0
         self.interfaces: List[NodeInterface] = []
+        self.interface_index: Dict[str, NodeInterface] = {}
+        self.interfaces_by_type: Dict[InterfaceTypes, List[NodeInterface]] = {
+            interface_type: [] for interface_type in InterfaceTypes
+        }
+        self.identity_interface: NodeInterface = None
+        self.loopback_ranges: List[LoopbackRange] = []
 
         if identity:
             self.create_new_loopback(network=identity)
         if mgmt:
             self.up_management_interface(network=mgmt)
 
-        self.identity_interface = self.interfaces[0]
         self.cdp = cdp
 
     def _set_hostname(self) -> str:
         return f"hostname {self.hostname}"
 
+    def _register_interface(self, interface: NodeInterface):
+        self.interfaces.append(interface)
+        self.interface_index[interface.name] = interface
+        self.interfaces_by_type[interface.type].append(interface)
+
     def create_new_loopback(self, network: Union[IPv4Interface, IPv4Address],
-                            description: str = None):
-        self.interfaces.append(NodeInterface(
+                            description: str = None) -> NodeInterface:
+        new_interface = NodeInterface(
             InterfaceTypes.LOOPBACK,
             get_loopback(self.next_loopback),
             network,
             description=description
-        ))
+        )
+
+        self._register_interface(new_interface)
+        if self.next_loopback == 0:
+            self.identity_interface = new_interface
         self.next_loopback += 1
 
+        return new_interface
+
+    def create_loopback_range(self, base: IPv4Address, count: int, prefix_len: int = 32,
+                              description: str = None) -> LoopbackRange:
+        if count <= 0 or not 0 <= prefix_len <= 32:
+            raise ValueError(f"Invalid loopback range of {count} /{prefix_len} prefixes")
+        if self.next_loopback + count - 1 > MAX_LOOPBACK:
+            raise ValueError(f"Loopbacks {self.next_loopback} to {self.next_loopback + count - 1} "
+                             f"exceed Loopback {MAX_LOOPBACK}")
+        if int(IPv4Address(base)) + (count << (32 - prefix_len)) > 1 << 32:
+            raise ValueError(f"{count} /{prefix_len} prefixes from {base} run past the IPv4 address space")
+
+        loopback_range = LoopbackRange(self.next_loopback, base, count, prefix_len, description)
+        self.loopback_ranges.append(loopback_range)
+        self.next_loopback += count
+
+        return loopback_range
+
     def create_new_data_link(self, network: Union[IPv4Interface, IPv4Address],
                              cdp: bool = False, description: str = None) -> NodeInterface:
         new_interface = NodeInterface(
@@ -98,26 +184,99 @@ class DataNode:
             description=description
         )
 
-        self.interfaces.append(new_interface)
+        self._register_interface(new_interface)
         self.next_data += 1
 
         return new_interface
 
-    def up_management_interface(self, network: Union[IPv4Interface, IPv4Address]):
-        self.interfaces.append(NodeInterface(
+    def up_management_interface(self, network: Union[IPv4Interface, IPv4Address]) -> NodeInterface:
+        new_interface = NodeInterface(
             InterfaceTypes.MGMT,
             get_mgmt(0),
             network
-        ))
+        )
 
-    def write_config(self, config_writer: ConfigWriter):
+        self._register_interface(new_interface)
+
+        return new_interface
+
+    @staticmethod
+    def _loopback_number(name: str) -> Optional[int]:
+        number = name[len(LOOPBACK_LINK_PREFIX):]
+        if not name.startswith(LOOPBACK_LINK_PREFIX) or not number.isdigit():
+            return None
+        return int(number)
+
+    def _get_range_interface(self, name: str) -> Optional[NodeInterface]:
+        number = self._loopback_number(name)
+        if number is None:
+            return None
+
+        for loopback_range in self.loopback_ranges:
+            interface = loopback_range.get_interface(number)
+            if interface is not None:
+                return interface
+        return None
+
+    def get_interface(self, name: str) -> NodeInterface:
+        """
+        Range loopbacks are not stored, so their interfaces are built on lookup and a new
+        object is returned on every call.
+        """
+        interface = self.interface_index.get(name)
+        if interface is None and self.loopback_ranges:
+            return self._get_range_interface(name)
+        return interface
+
+    def get_interfaces_by_type(self, interface_type: InterfaceTypes) -> List[NodeInterface]:
+        if interface_type != InterfaceTypes.LOOPBACK or not self.loopback_ranges:
+            return self.interfaces_by_type[interface_type]
+
+        interfaces = []
+        for section in self.iter_sections():
+            if isinstance(section, LoopbackRange):
+                interfaces.extend(section.interfaces())
+            elif section.type == InterfaceTypes.LOOPBACK:
+                interfaces.append(section)
+        return interfaces
+
+    def _write_header(self, config_writer: ConfigWriter):
         config_writer.line_return()
         config_writer.add_config(self._set_hostname())
         if self.cdp:
             config_writer.add_config(self._set_cdp())
 
+    @classmethod
+    def compile_template(cls, cdp: bool) -> str:
+        """
+        The lines written before the interfaces, with the hostname as {0}.
+        """
+        return ConfigWriter.capture(cls("{0}", None, None, cdp)._write_header)
+
+    def iter_sections(self) -> Iterator[Union[NodeInterface, LoopbackRange]]:
+        """
+        The interfaces in creation order with every loopback range placed before the first
+        loopback numbered after it, so loopbacks come out in number order.
+        """
+        loopback_ranges = iter(self.loopback_ranges)
+        pending = next(loopback_ranges, None)
         for interface in self.interfaces:
-            interface.write_config(config_writer)
+            if pending is not None and interface.type == InterfaceTypes.LOOPBACK:
+                number = self._loopback_number(interface.name)
+                while pending is not None and pending.first_loopback < number:
+                    yield pending
+                    pending = next(loopback_ranges, None)
+            yield interface
+
+        while pending is not None:
+            yield pending
+            pending = next(loopback_ranges, None)
+
+    def write_config(self, config_writer: ConfigWriter):
+        self._write_header(config_writer)
+
+        for section in self.iter_sections():
+            section.write_config(config_writer)
 
 
 class PointToPointTopology:
@@ -131,6 +290,8 @@ class PointToPointTopology:
 
     def __init__(self, name: str, path: str = None, config: dict = DEFAULT_CONFIGS):
         self.nodes: List[DataNode] = []
+        self.hostname_index: Dict[str, int] = {}
+        self.adjacency: List[List[int]] = []
         self.name = name
 
         if not path:
@@ -145,8 +306,14 @@ class PointToPointTopology:
             new_prefix=self.config[ConfigKeys.DATA_LINK_SUBNET_LEN]
         )
         self.interface_mapping: Dict[Tuple, NodeInterface] = dict()
+        self.links: List[Tuple[int, int]] = []
+        self.link_interfaces: List[Tuple[NodeInterface, NodeInterface]] = []
+        self.render_plan = None
+        self.inventory: Inventory = None
 
     def _add_node(self, hostname: str, identity: Union[IPv4Interface, IPv4Address], mgmt: IPv4Interface):
+        self.hostname_index.setdefault(hostname, len(self.nodes))
+        self.adjacency.append([])
         self.nodes.append(
             DataNode(hostname, identity, mgmt, self.config[ConfigKeys.CDP])
         )
@@ -171,6 +338,10 @@ class PointToPointTopology:
 
         self.interface_mapping[(i, j)] = interface_j
         self.interface_mapping[(j, i)] = interface_i
+        self.links.append((i, j))
+        self.link_interfaces.append((interface_i, interface_j))
+        self.adjacency[i].append(j)
+        self.adjacency[j].append(i)
 
     def generate_point_to_point_topology(self, node_identifiers: List[Tuple[str, str, str]],
                                          links: List[Tuple[int, int]]):
@@ -180,13 +351,100 @@ class PointToPointTopology:
         for i, j in links:
             self._add_link(i, j)
 
+    def add_node(self, hostname: str, identifier: str, mgmt: str) -> int:
+        self._add_node(hostname, IPv4Address(identifier), IPv4Interface(mgmt))
+        return len(self.nodes) - 1
+
+    def add_link(self, i: int, j: int) -> int:
+        self._add_link(i, j)
+        return len(self.links) - 1
+
     def get_transmit_data_interface(self, i: int, j: int) -> NodeInterface:
         return self.interface_mapping.get((i, j))
 
-    def write_config(self):
-        os.makedirs(self.path, exist_ok=True)
-        for node in self.nodes:
-            config_writer = ConfigWriter(node.hostname)
-            node.write_config(config_writer)
+    def get_node_index(self, hostname: str) -> int:
+        return self.hostname_index.get(hostname)
+
+    def get_node(self, hostname: str) -> DataNode:
+        index = self.hostname_index.get(hostname)
+        return self.nodes[index] if index is not None else None
+
+    def get_interface(self, i: int, name: str) -> NodeInterface:
+        return self.nodes[i].get_interface(name)
+
+    def get_interfaces_by_type(self, i: int, interface_type: InterfaceTypes) -> List[NodeInterface]:
+        return self.nodes[i].get_interfaces_by_type(interface_type)
+
+    def get_neighbors(self, i: int) -> List[int]:
+        return self.adjacency[i]
+
+    def validate(self) -> List[TopologyConflict]:
+        return TopologyValidator(self).validate()
+
+    def _write_node(self, i: int, config_writer: ConfigWriter):
+        self.nodes[i].write_config(config_writer)
+
+    def _render_writers(self, write_node: Callable[[int, ConfigWriter], None],
+                        line_pool: LinePool = None) -> List[ConfigWriter]:
+        writers = []
+        for i, node in enumerate(self.nodes):
+            config_writer = ConfigWriter(node.hostname, line_pool)
+            write_node(i, config_writer)
             config_writer.new_line()
-            config_writer.write(self.path)
+            writers.append(config_writer)
+
+        return writers
+
+    def render_writers(self, line_pool: LinePool = None) -> List[ConfigWriter]:
+        return self._render_writers(self._write_node, line_pool)
+
+    def use_inventory(self, inventory: Inventory):
+        self.inventory = inventory
+
+    def use_render_plan(self, render_plan):
+        self.render_plan = render_plan
+
+    def _render_node(self, i: int) -> str:
+        if self.render_plan is not None:
+            return self.render_plan.render_data_node(self.nodes[i])
+
+        config_writer = ConfigWriter(self.nodes[i].hostname)
+        self.nodes[i].write_config(config_writer)
+        config_writer.new_line()
+        return config_writer.__str__()
+
+    def _get_bundle_path(self, bundle_format: BundleFormat) -> str:
+        return os.path.normpath(self.path) + "." + str(bundle_format)
+
+    def write_bundle(self, bundle_format: BundleFormat = BundleFormat.INDEXED,
+                     validate: bool = True) -> str:
+        if validate:
+            TopologyValidator(self).check()
+
+        return write_bundle(self._get_bundle_path(bundle_format), (
+            (node.hostname, self._render_node(i)) for i, node in enumerate(self.nodes)
+        ), bundle_format)
+
+    def _write_grouped_config(self, render_node: Callable[[int], str]) -> Dict[str, GroupReport]:
+        os.makedirs(self.path, exist_ok=True)
+        group_compressor = GroupCompressor()
+        reports: Dict[str, GroupReport] = {}
+
+        for i, node in enumerate(self.nodes):
+            configs, reports[node.hostname] = group_compressor.compress(render_node(i))
+            with open(os.path.join(self.path, f"{node.hostname}.conf"), "w") as config_file:
+                config_file.write(configs)
+
+        return reports
+
+    def write_config(self, validate: bool = True, grouped: bool = False) -> Optional[Dict[str, GroupReport]]:
+        if validate:
+            TopologyValidator(self).check()
+
+        if grouped:
+            return self._write_grouped_config(self._render_node)
+
+        os.makedirs(self.path, exist_ok=True)
+        for i, node in enumerate(self.nodes):
+            with open(os.path.join(self.path, f"{node.hostname}.conf"), "w") as config_file:
+                config_file.write(self._render_node(i))
@@ -0,0 +1,135 @@
+from typing import Dict, Tuple
+from .bgp_topology import *
+
+OCTETS = [str(octet) for octet in range(256)]
+
+
+def _format_prefix(ip: int, prefix_len: int) -> str:
+    return f"{OCTETS[ip >> 24]}.{OCTETS[ip >> 16 & 255]}.{OCTETS[ip >> 8 & 255]}.{OCTETS[ip & 255]}/{prefix_len}"
+
+
+def _format_address(network: Union[IPv4Interface, IPv4Address]) -> str:
+    if isinstance(network, IPv4Interface):
+        return _format_prefix(int(network), network.network.prefixlen)
+    return _format_prefix(int(network), 32)
+
+
+class RenderPlan:
+    """
+    Flat format templates for the node models. Each model compiles its templates from the
+    same config sections its write_config is made of (see compile_template on NodeInterface,
+    DataNode, ISISInterface, ISISNode, BGPNeighbor and BGPNode), so rendering a node is one
+    template fill per section instead of a chain of ConfigWriter calls, with the same text.
+    Templates are compiled on first use for every variant (interface type, description,
+    cdp, ISIS address families) a topology contains.
+    """
+
+    def __init__(self) -> None:
+        self.node_templates: Dict[bool, str] = {}
+        self.interface_templates: Dict[Tuple[InterfaceTypes, bool, bool], str] = {}
+        self.isis_node_templates: Dict[Tuple, Tuple[str, str]] = {}
+        self.isis_interface_templates: Dict[InterfaceTypes, Tuple[str, str, str]] = {}
+        self.bgp_templates: Tuple = None
+
+    def _node_template(self, cdp: bool) -> str:
+        if cdp not in self.node_templates:
+            self.node_templates[cdp] = DataNode.compile_template(cdp)
+        return self.node_templates[cdp]
+
+    def _interface_template(self, interface_type: InterfaceTypes, description: bool, cdp: bool) -> str:
+        key = (interface_type, description, cdp)
+        if key not in self.interface_templates:
+            self.interface_templates[key] = NodeInterface.compile_template(interface_type, description, cdp)
+        return self.interface_templates[key]
+
+    def _isis_node_template(self, node: ISISNode) -> Tuple[str, str]:
+        key = tuple(node.config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES])
+        if key not in self.isis_node_templates:
+            self.isis_node_templates[key] = ISISNode.compile_template(list(key))
+        return self.isis_node_templates[key]
+
+    def _isis_interface_template(self, interface_type: InterfaceTypes) -> Tuple[str, str, str]:
+        if interface_type not in self.isis_interface_templates:
+            self.isis_interface_templates[interface_type] = ISISInterface.compile_template(interface_type)
+        return self.isis_interface_templates[interface_type]
+
+    def _bgp_template(self) -> Tuple:
+        if self.bgp_templates is None:
+            self.bgp_templates = BGPNode.compile_template()
+        return self.bgp_templates
+
+    def render_data_node(self, node: DataNode) -> str:
+        pieces = [self._node_template(node.cdp).format(node.hostname)]
+
+        for section in node.iter_sections():
+            if isinstance(section, NodeInterface):
+                template = self._interface_template(section.type, bool(section.description), bool(section.cdp))
+                pieces.append(template.format(section.name, section.description, _format_address(section.network)))
+                continue
+
+            loopback_range = section
+            template = self._interface_template(InterfaceTypes.LOOPBACK, bool(loopback_range.description), False)
+            base = int(loopback_range.base)
+            step = 1 << (32 - loopback_range.prefix_len)
+            for k in range(loopback_range.count):
+                pieces.append(template.format(
+                    get_loopback(loopback_range.first_loopback + k), loopback_range.description,
+                    _format_prefix(base + k * step, loopback_range.prefix_len)
+                ))
+
+        pieces.append("")
+        return "\n".join(pieces)
+
+    def render_isis_node(self, node: ISISNode) -> str:
+        header, footer = self._isis_node_template(node)
+        pieces = [header.format(node.process_name, node.is_level, node.net_id)]
+
+        for interface in node.interfaces:
+            interface_type = interface.node_interface.type
+            if interface_type == InterfaceTypes.MGMT:
+                continue
+
+            head, af_block, tail = self._isis_interface_template(interface_type)
+            pieces.append(head.format(interface.node_interface.name))
+            for af, metric in interface.af_metric_list:
+                pieces.append(af_block.format(af, metric))
+            pieces.append(tail)
+
+        pieces.append(footer)
+        pieces.append("")
+        return "\n".join(pieces)
+
+    def render_bgp_node(self, node: BGPNode) -> str:
+        process, (af_head, network_line, af_tail), (neighbor_head, neighbor_af, neighbor_tail), footer = \
+            self._bgp_template()
+        pieces = [process.format(node.asn, node.igp_node.data_node.identity)]
+
+        for af in AddressFamily.get_supported_address_families():
+            pieces.append(af_head.format(af))
+            for _, network, address_families in node.af_prefixes:
+                if af in address_families:
+                    pieces.append(network_line.format(network))
+
+            for prefix_range in node.prefix_ranges:
+                if af not in prefix_range.address_families:
+                    continue
+
+                loopback_range = prefix_range.loopback_range
+                base = int(loopback_range.base)
+                step = 1 << (32 - loopback_range.prefix_len)
+                for k in range(loopback_range.count):
+                    pieces.append(network_line.format(
+                        _format_prefix((base + k * step) & -step, loopback_range.prefix_len)
+                    ))
+            pieces.append(af_tail)
+
+        for neighbor in node.neighbors:
+            pieces.append(neighbor_head.format(neighbor.neighbor_identifier, neighbor.neighbor_as,
+                                               neighbor.update_source))
+            for af in neighbor.address_families:
+                pieces.append(neighbor_af.format(af))
+            pieces.append(neighbor_tail)
+
+        pieces.append(footer)
+        pieces.append("")
+        return "\n".join(pieces)
@@ -0,0 +1,135 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .point_to_point_topology import *
+from .deployer import Deployer
+
+DEFAULT_MAX_PER_WAVE = 32
+
+
+class DeployScheduler:
+    """
+    Deploys hosts in waves ordered by breadth first distance from a set of seed nodes, so
+    that the core of the topology is configured before its edges. Hosts within a wave are
+    pushed concurrently, capped per wave (DEFAULT_MAX_PER_WAVE sessions unless max_per_wave
+    is given) and per terminal server namespace.
+    """
+
+    SKIPPED = "Skipped: a previous deployment wave exceeded the failure threshold"
+
+    def __init__(self, deployer: Deployer, topology: PointToPointTopology, seeds: List[str] = None,
+                 max_per_wave: int = DEFAULT_MAX_PER_WAVE, max_per_namespace: int = None,
+                 failure_threshold: int = None) -> None:
+        self.deployer = deployer
+        self.topology = topology
+        self.seeds = seeds
+        self.max_per_wave = max_per_wave or DEFAULT_MAX_PER_WAVE
+        self.max_per_namespace = max_per_namespace
+        self.failure_threshold = failure_threshold
+        self.namespace_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.namespace_limits_lock = threading.Lock()
+
+    def _get_seed_indices(self) -> List[int]:
+        if self.seeds:
+            indices = []
+            for hostname in self.seeds:
+                index = self.topology.get_node_index(hostname)
+                assert index is not None, f"Seed {hostname} is not part of the topology"
+                indices.append(index)
+            return indices
+
+        if not self.topology.nodes:
+            return []
+
+        return [max(range(len(self.topology.nodes)), key=lambda i: len(self.topology.get_neighbors(i)))]
+
+    def build_waves(self) -> List[List[str]]:
+        distances = [-1] * len(self.topology.nodes)
+        queue = deque()
+        for i in self._get_seed_indices():
+            if distances[i] < 0:
+                distances[i] = 0
+                queue.append(i)
+
+        while queue:
+            i = queue.popleft()
+            for j in self.topology.get_neighbors(i):
+                if distances[j] < 0:
+                    distances[j] = distances[i] + 1
+                    queue.append(j)
+
+        wave_count = max(distances, default=-1) + 1
+        waves: List[List[str]] = [[] for _ in range(wave_count)]
+        unreachable = []
+
+        for hostname in self.deployer.host_ports.keys():
+            index = self.topology.get_node_index(hostname)
+            if index is None or distances[index] < 0:
+                unreachable.append(hostname)
+            else:
+                waves[distances[index]].append(hostname)
+
+        if unreachable:
+            waves.append(unreachable)
+
+        return waves
+
+    def _get_namespace_limit(self, hostname: str) -> threading.BoundedSemaphore:
+        namespace = self.deployer.get_namespace(hostname)
+        with self.namespace_limits_lock:
+            if namespace not in self.namespace_limits:
+                self.namespace_limits[namespace] = threading.BoundedSemaphore(self.max_per_namespace)
+            return self.namespace_limits[namespace]
+
+    def _threshold_reached(self, failures: Dict[str, str]) -> bool:
+        return self.failure_threshold is not None and \
+            sum(1 for error in failures.values() if error != self.SKIPPED) >= self.failure_threshold
+
+    def _deploy_wave(self, wave: List[str]) -> Dict[str, str]:
+        failures: Dict[str, str] = {}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def deploy_host(hostname: str):
+            if stop.is_set():
+                error = self.SKIPPED
+            elif self.max_per_namespace:
+                with self._get_namespace_limit(hostname):
+                    error = self.SKIPPED if stop.is_set() else self.deployer.deploy_host(hostname)
+            else:
+                error = self.deployer.deploy_host(hostname)
+
+            if error is None:
+                return
+
+            with lock:
+                failures[hostname] = error
+                if self._threshold_reached(failures):
+                    stop.set()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_per_wave, len(wave))) as executor:
+            list(executor.map(deploy_host, wave))
+
+        return failures
+
+    def deploy(self) -> Dict[str, str]:
+        failures: Dict[str, str] = {}
+        waves = self.build_waves()
+
+        for wave_index, wave in enumerate(waves):
+            if not wave:
+                continue
+
+            print(f"Deploying wave {wave_index} with {len(wave)} host(s)")
+            wave_failures = self._deploy_wave(wave)
+            failures.update(wave_failures)
+
+            if self._threshold_reached(wave_failures):
+                print(f"Stopping deployment after wave {wave_index}: "
+                      f"{len(wave_failures)} host(s) failed")
+                for later_wave in waves[wave_index + 1:]:
+                    for hostname in later_wave:
+                        failures[hostname] = self.SKIPPED
+                break
+
+        return failures
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_POOL_SIZE = 32
+
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+def _default_prompts(hostname: str) -> List[str]:
+    return [f"{hostname}#"]
+
+
+class SessionPool:
+    """
+    Keeps logged in sessions open at the exec prompt between uses, so repeated deploys and
+    audits against the same hosts skip connection setup and login. A borrowed session is
+    health checked first (a new line has to bring back the prompt), and sessions idle for
+    longer than idle_timeout are closed. At most max_size sessions are open at a time,
+    borrowed ones included: when the pool is full, the least recently used idle session
+    is closed to make room, and if every session is borrowed, borrow waits for one to come
+    back (up to borrow_timeout seconds, then raises RuntimeError).
+    """
+
+    def __init__(self, connect: Callable[[str], object], max_size: int = DEFAULT_POOL_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 prompts: Callable[[str], List[str]] = _default_prompts,
+                 clock: Callable[[], float] = time.monotonic,
+                 borrow_timeout: float = None) -> None:
+        assert max_size > 0, "Pool size must be positive"
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.prompts = prompts
+        self.clock = clock
+        self.borrow_timeout = borrow_timeout
+        self.idle: "OrderedDict[int, Tuple[str, object, float]]" = OrderedDict()
+        self.borrowed = 0
+        self.lock = threading.Lock()
+        self.returned = threading.Condition(self.lock)
+
+    @staticmethod
+    def _close(session):
+        try:
+            session.close()
+        except (OSError, EOFError):
+            pass
+
+    def _is_healthy(self, hostname: str, session) -> bool:
+        try:
+            session.read_very_eager()
+            session.new_line()
+            idx, _, _ = session.check_for(self.prompts(hostname))
+        except (OSError, EOFError):
+            return False
+        return idx >= 0
+
+    def _take_expired(self) -> List[object]:
+        deadline = self.clock() - self.idle_timeout
+        expired = [key for key, (_, _, released) in self.idle.items() if released < deadline]
+        return [self.idle.pop(key)[1] for key in expired]
+
+    def _take_idle(self, hostname: str):
+        for key in reversed(self.idle):
+            if self.idle[key][0] == hostname:
+                return self.idle.pop(key)[1]
+        return None
+
+    def _return_slot(self):
+        with self.lock:
+            self.borrowed -= 1
+            self.returned.notify()
+
+    def evict_idle(self) -> int:
+        with self.lock:
+            expired = self._take_expired()
+            if expired:
+                self.returned.notify_all()
+        for session in expired:
+            self._close(session)
+        return len(expired)
+
+    def _reserve(self, hostname: str) -> Tuple[object, List[object]]:
+        deadline = None if self.borrow_timeout is None else time.monotonic() + self.borrow_timeout
+        closing = []
+        with self.lock:
+            while True:
+                closing.extend(self._take_expired())
+                session = self._take_idle(hostname)
+                if session is None and self.idle and self.borrowed + len(self.idle) >= self.max_size:
+                    closing.append(self.idle.popitem(last=False)[1][1])
+
+                if session is not None or self.borrowed + len(self.idle) < self.max_size:
+                    self.borrowed += 1
+                    return session, closing
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise RuntimeError(f"No session to {hostname} available: "
+                                       f"all {self.max_size} pooled sessions are in use")
+                self.returned.wait(remaining)
+
+    def borrow(self, hostname: str):
+        while True:
+            session, closing = self._reserve(hostname)
+            for stale_session in closing:
+                self._close(stale_session)
+
+            if session is None:
+                try:
+                    return self.connect(hostname)
+                except BaseException:
+                    self._return_slot()
+                    raise
+
+            if self._is_healthy(hostname, session):
+                return session
+            self._close(session)
+            self._return_slot()
+
+    def release(self, hostname: str, session):
+        with self.lock:
+            self.borrowed -= 1
+            self.idle[id(session)] = (hostname, session, self.clock())
+            self.returned.notify()
+
+    def discard(self, session):
+        self._close(session)
+        self._return_slot()
+
+    @contextmanager
+    def session(self, hostname: str):
+        session = self.borrow(hostname)
+        try:
+            yield session
+        except BaseException:
+            self.discard(session)
+            raise
+        self.release(hostname, session)
+
+    def idle_sessions(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self.lock:
+            for hostname, _, _ in self.idle.values():
+                counts[hostname] = counts.get(hostname, 0) + 1
+        return counts
+
+    def close(self):
+        with self.lock:
+            sessions = [session for _, session, _ in self.idle.values()]
+            self.idle.clear()
+            self.returned.notify_all()
+        for session in sessions:
+            self._close(session)
+
+    def __len__(self) -> int:
+        return len(self.idle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
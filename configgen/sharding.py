@@ -0,0 +1,358 @@
+import json
+import multiprocessing
+from collections import deque
+from .bgp_topology import *
+from .deployer import Deployer
+from .inventory import Inventory
+
+
+class TopologyShard:
+    def __init__(self, index: int, node_indices: List[int], weight: int) -> None:
+        self.index = index
+        self.node_indices = node_indices
+        self.weight = weight
+
+
+class TopologySharder:
+    """
+    Splits a topology into shards of similar weight by growing each shard breadth first from
+    a seed node, so that neighbouring routers tend to land in the same shard. A node weighs
+    one plus the number of its interfaces, range loopbacks included, which roughly tracks its
+    config size. Shard jobs carry the ISIS and BGP layers of the nodes along with their data
+    node, so workers render the same configs as the whole topology.
+    """
+
+    @staticmethod
+    def _node_weight(node: DataNode) -> int:
+        return 1 + len(node.interfaces) + sum(
+            loopback_range.count for loopback_range in node.loopback_ranges
+        )
+
+    @staticmethod
+    def _interface_spec(interface: NodeInterface) -> list:
+        return [str(interface.type), interface.name, str(interface.network),
+                interface.cdp, interface.description]
+
+    @staticmethod
+    def _node_spec(node: DataNode) -> dict:
+        return {
+            "hostname": node.hostname,
+            "identity": str(node.identity) if node.identity else None,
+            "mgmt": str(node.mgmt) if node.mgmt else None,
+            "cdp": node.cdp,
+            "interfaces": [
+                TopologySharder._interface_spec(interface) for interface in node.interfaces
+            ],
+            "loopback_ranges": [
+                [loopback_range.first_loopback, str(loopback_range.base), loopback_range.count,
+                 loopback_range.prefix_len, loopback_range.description]
+                for loopback_range in node.loopback_ranges
+            ]
+        }
+
+    @staticmethod
+    def _address_families_spec(address_families: Iterable[AddressFamily]) -> List[str]:
+        return [str(af) for af in address_families]
+
+    @staticmethod
+    def _isis_spec(node: ISISNode) -> dict:
+        return {
+            "process_name": node.process_name,
+            "is_level": str(node.is_level),
+            "net_id": node.net_id,
+            "address_families": TopologySharder._address_families_spec(
+                node.config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES]
+            ),
+            "interfaces": [
+                [interface.node_interface.name,
+                 [[str(af), int(metric)] for af, metric in interface.af_metric_list]]
+                for interface in node.interfaces
+            ]
+        }
+
+    @staticmethod
+    def _bgp_spec(node: BGPNode) -> dict:
+        return {
+            "asn": node.asn,
+            "prefixes": [
+                [str(interface), str(network), TopologySharder._address_families_spec(address_families)]
+                for interface, network, address_families in node.af_prefixes
+            ],
+            "prefix_ranges": [
+                [prefix_range.loopback_range.first_loopback,
+                 TopologySharder._address_families_spec(prefix_range.address_families)]
+                for prefix_range in node.prefix_ranges
+            ],
+            "neighbors": [
+                [str(neighbor.neighbor_identifier), neighbor.neighbor_as,
+                 neighbor.update_source.name if neighbor.update_source else None,
+                 TopologySharder._address_families_spec(neighbor.address_families)]
+                for neighbor in node.neighbors
+            ]
+        }
+
+    def __init__(self, topology: Union[PointToPointTopology, ISISTopology, BGPTopology],
+                 shard_count: int) -> None:
+        assert shard_count > 0, "Shard count must be positive"
+        self.bgp_topology: BGPTopology = topology if isinstance(topology, BGPTopology) else None
+        if self.bgp_topology is not None:
+            topology = self.bgp_topology.igp_topology
+
+        self.isis_topology: ISISTopology = topology if isinstance(topology, ISISTopology) else None
+        if self.isis_topology is not None:
+            topology = self.isis_topology.point_to_point_topology
+
+        self.topology: PointToPointTopology = topology
+        self.shard_count = min(shard_count, max(len(topology.nodes), 1))
+        self.weights = [self._node_weight(node) for node in topology.nodes]
+
+    def _layered_node_spec(self, i: int) -> dict:
+        spec = self._node_spec(self.topology.nodes[i])
+        if self.isis_topology is not None:
+            spec["isis"] = self._isis_spec(self.isis_topology.nodes[i])
+        if self.bgp_topology is not None and i in self.bgp_topology.node_dict:
+            spec["bgp"] = self._bgp_spec(self.bgp_topology.node_dict[i])
+        return spec
+
+    def _next_seed(self, assigned: List[bool], start: int) -> int:
+        while start < len(assigned) and assigned[start]:
+            start += 1
+        return start
+
+    def partition(self) -> List[TopologyShard]:
+        node_count = len(self.topology.nodes)
+        assigned = [False] * node_count
+        remaining_weight = sum(self.weights)
+        seed = 0
+        shards = []
+
+        for index in range(self.shard_count):
+            target = remaining_weight / (self.shard_count - index)
+            last_shard = index == self.shard_count - 1
+            members, weight = [], 0
+            queue = deque()
+
+            while (last_shard or weight < target) and len(members) < node_count:
+                if not queue:
+                    seed = self._next_seed(assigned, seed)
+                    if seed == node_count:
+                        break
+                    queue.append(seed)
+
+                i = queue.popleft()
+                if assigned[i]:
+                    continue
+
+                assigned[i] = True
+                members.append(i)
+                weight += self.weights[i]
+                queue.extend(j for j in self.topology.get_neighbors(i) if not assigned[j])
+
+            remaining_weight -= weight
+            shards.append(TopologyShard(index, members, weight))
+
+        return shards
+
+    def export_job(self, shard: TopologyShard, inventory: Inventory = None) -> dict:
+        if inventory is None:
+            inventory = self.topology.inventory
+
+        nodes = [self.topology.nodes[i] for i in shard.node_indices]
+        job = {
+            "name": self.topology.name,
+            "shard": shard.index,
+            "path": os.path.join(self.topology.path, f"shard-{shard.index}"),
+            "nodes": [self._layered_node_spec(i) for i in shard.node_indices],
+            "deploy": None
+        }
+
+        if inventory is not None:
+            job["deploy"] = {"inventory": [
+                [node.hostname, inventory.get_entry(node.hostname).namespace,
+                 inventory.get_entry(node.hostname).port, *inventory.get_cred(node.hostname)]
+                for node in nodes
+            ]}
+
+        return job
+
+    def export_jobs(self, shards: List[TopologyShard], inventory: Inventory = None) -> List[dict]:
+        return [self.export_job(shard, inventory) for shard in shards]
+
+    @staticmethod
+    def _strip_credentials(job: dict) -> dict:
+        if not job["deploy"]:
+            return job
+
+        return dict(job, deploy=dict(job["deploy"], inventory=[
+            [hostname, namespace, port, None, None]
+            for hostname, namespace, port, _, _ in job["deploy"]["inventory"]
+        ]))
+
+    @staticmethod
+    def write_jobs(jobs: List[dict], path: str, include_credentials: bool = False) -> List[str]:
+        """
+        Job files leave credentials out unless include_credentials is set, in which case
+        they hold plaintext passwords and are created readable by the owner only. A worker
+        running a job file without credentials passes its own inventory to run_shard_job.
+        """
+        os.makedirs(path, exist_ok=True)
+        job_files = []
+        for job in jobs:
+            job_file = os.path.join(path, f"{job['name']}-shard-{job['shard']}.json")
+            if include_credentials:
+                with open(os.open(job_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                    json.dump(job, f)
+            else:
+                with open(job_file, "w") as f:
+                    json.dump(TopologySharder._strip_credentials(job), f)
+            job_files.append(job_file)
+
+        return job_files
+
+
+def _parse_network(network: str) -> Union[IPv4Interface, IPv4Address]:
+    return IPv4Interface(network) if "/" in network else IPv4Address(network)
+
+
+def _build_node(spec: dict) -> DataNode:
+    node = DataNode(spec["hostname"], None, None, spec["cdp"])
+    node.identity = IPv4Address(spec["identity"]) if spec["identity"] else None
+    node.mgmt = IPv4Interface(spec["mgmt"]) if spec["mgmt"] else None
+
+    for interface_type, name, network, cdp, description in spec["interfaces"]:
+        interface = NodeInterface(InterfaceTypes(interface_type), name, _parse_network(network),
+                                  cdp=cdp, description=description)
+        node._register_interface(interface)
+
+        if interface.type == InterfaceTypes.LOOPBACK:
+            if node.identity_interface is None:
+                node.identity_interface = interface
+            node.next_loopback += 1
+        elif interface.type == InterfaceTypes.DATA:
+            node.next_data += 1
+
+    for first_loopback, base, count, prefix_len, description in spec["loopback_ranges"]:
+        node.loopback_ranges.append(
+            LoopbackRange(first_loopback, IPv4Address(base), count, prefix_len, description)
+        )
+        node.next_loopback = max(node.next_loopback, first_loopback + count)
+
+    return node
+
+
+def _parse_address_families(address_families: List[str]) -> List[AddressFamily]:
+    return [AddressFamily(af) for af in address_families]
+
+
+def _build_isis_node(data_node: DataNode, spec: dict) -> ISISNode:
+    config = dict(DEFAULT_CONFIGS)
+    config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES] = _parse_address_families(spec["address_families"])
+    node = ISISNode(data_node, ISLevel(spec["is_level"]), spec["process_name"], config, net_id=spec["net_id"])
+
+    for name, af_metric_list in spec["interfaces"]:
+        node.create_new_isis_link(
+            data_node.get_interface(name), [(AddressFamily(af), metric) for af, metric in af_metric_list]
+        )
+
+    return node
+
+
+def _build_bgp_node(isis_node: ISISNode, spec: dict) -> BGPNode:
+    data_node = isis_node.data_node
+    node = BGPNode(isis_node, spec["asn"])
+
+    for interface, network, address_families in spec["prefixes"]:
+        node.af_prefixes.append(
+            (_parse_network(interface), IPv4Network(network), _parse_address_families(address_families))
+        )
+
+    loopback_ranges = {loopback_range.first_loopback: loopback_range for loopback_range in data_node.loopback_ranges}
+    for first_loopback, address_families in spec["prefix_ranges"]:
+        node.prefix_ranges.append(
+            PrefixRange(loopback_ranges[first_loopback], _parse_address_families(address_families))
+        )
+
+    for identifier, asn, update_source, address_families in spec["neighbors"]:
+        node.neighbors.append(BGPNeighbor(
+            IPv4Address(identifier), asn,
+            data_node.get_interface(update_source) if update_source else None,
+            _parse_address_families(address_families)
+        ))
+
+    return node
+
+
+def _render_job_node(spec: dict) -> str:
+    data_node = _build_node(spec)
+    layers = [data_node]
+    if spec.get("isis"):
+        layers.append(_build_isis_node(data_node, spec["isis"]))
+        if spec.get("bgp"):
+            layers.append(_build_bgp_node(layers[-1], spec["bgp"]))
+
+    configs = ""
+    for layer in layers:
+        config_writer = ConfigWriter(data_node.hostname)
+        layer.write_config(config_writer)
+        config_writer.new_line()
+        configs += config_writer.__str__()
+    return configs
+
+
+def _job_inventory(rows: List[list], inventory: Inventory = None) -> Inventory:
+    job_inventory = Inventory.from_rows(rows)
+    if inventory is not None:
+        for hostname, entry in job_inventory.entries.items():
+            if entry.user is None and inventory.has_cred(hostname):
+                entry.user, entry.passwd = inventory.get_cred(hostname)
+    return job_inventory
+
+
+def run_shard_job(job: dict, path: str = None, inventory: Inventory = None) -> dict:
+    path = path or job["path"]
+    os.makedirs(path, exist_ok=True)
+
+    hosts = {}
+    for spec in job["nodes"]:
+        with open(os.path.join(path, f"{spec['hostname']}.conf"), "w") as config_file:
+            config_file.write(_render_job_node(spec))
+        hosts[spec["hostname"]] = {"shard": job["shard"], "rendered": True,
+                                   "deployed": False, "error": None}
+
+    deploy = job["deploy"]
+    if deploy:
+        try:
+            deployer = Deployer(path, inventory=_job_inventory(deploy["inventory"], inventory))
+            failures = deployer.deploy()
+        except (RuntimeError, OSError, EOFError, AssertionError) as e:
+            failures = {row[0]: str(e) for row in deploy["inventory"]}
+
+        for hostname, error in failures.items():
+            hosts[hostname]["error"] = error
+        for hostname, _, _, _, _ in deploy["inventory"]:
+            hosts[hostname]["deployed"] = hostname not in failures
+
+    return {"shard": job["shard"], "path": path, "hosts": hosts}
+
+
+def merge_shard_results(results: List[dict]) -> Dict[str, dict]:
+    merged: Dict[str, dict] = {}
+    for result in sorted(results, key=lambda r: r["shard"]):
+        merged.update(result["hosts"])
+
+    return merged
+
+
+class LocalShardRunner:
+    """
+    Stand-in for a pool of worker hosts: runs every shard job in a separate local process.
+    """
+
+    def __init__(self, processes: int = None) -> None:
+        self.processes = processes
+
+    def run(self, jobs: List[dict]) -> Dict[str, dict]:
+        with multiprocessing.Pool(self.processes or len(jobs) or 1) as pool:
+            results = pool.map(run_shard_job, jobs)
+
+        return merge_shard_results(results)
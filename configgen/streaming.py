@@ -0,0 +1,155 @@
+import os.path
+import tempfile
+from array import array
+from itertools import islice
+from typing import Iterable
+from .point_to_point_topology import *
+
+LINK_RECORD = "q"
+
+
+class LinkBuckets:
+    """
+    Spills (link, i, j) records to one temporary file per bucket of consecutive node
+    indices. Records are buffered in memory and appended to the bucket files whenever the
+    buffer fills, so neither the buffer nor the number of open files grows with the fleet.
+    """
+
+    def __init__(self, path: str, bucket_size: int, buffer_records: int = 1 << 16) -> None:
+        self.path = path
+        self.bucket_size = bucket_size
+        self.buffer_records = buffer_records
+        self.buffers: Dict[int, array] = {}
+        self.buffered = 0
+        self.last_bucket = -1
+
+    def _bucket_file(self, bucket: int) -> str:
+        return os.path.join(self.path, f"{bucket}.links")
+
+    def _add(self, bucket: int, k: int, i: int, j: int):
+        self.buffers.setdefault(bucket, array(LINK_RECORD)).extend((k, i, j))
+        self.last_bucket = max(self.last_bucket, bucket)
+        self.buffered += 1
+        if self.buffered >= self.buffer_records:
+            self.flush()
+
+    def add_link(self, k: int, i: int, j: int):
+        bucket_i, bucket_j = i // self.bucket_size, j // self.bucket_size
+        self._add(bucket_i, k, i, j)
+        if bucket_j != bucket_i:
+            self._add(bucket_j, k, i, j)
+
+    def flush(self):
+        for bucket, records in self.buffers.items():
+            with open(self._bucket_file(bucket), "ab") as bucket_file:
+                records.tofile(bucket_file)
+        self.buffers.clear()
+        self.buffered = 0
+
+    def read(self, bucket: int) -> array:
+        records = array(LINK_RECORD)
+        bucket_file = self._bucket_file(bucket)
+        if os.path.exists(bucket_file):
+            with open(bucket_file, "rb") as links_file:
+                records.frombytes(links_file.read())
+            os.remove(bucket_file)
+        return records
+
+
+class StreamingTopologyWriter:
+    """
+    Writes the configs of a point to point topology from node and link iterators without
+    holding the whole topology. Links are first bucketed on disk by the nodes they touch;
+    nodes are then built, rendered and written one bucket at a time, so peak memory follows
+    the bucket size instead of the fleet size. Link k gets the k-th data link subnet and
+    interfaces are created in link order, which gives the same configs as
+    PointToPointTopology.write_config. Topology wide validation is not run.
+    """
+
+    def __init__(self, name: str, path: str = None, config: dict = DEFAULT_CONFIGS,
+                 bucket_size: int = 4096) -> None:
+        self.name = name
+        if not path:
+            self.path = "./" + self.name
+        else:
+            self.path = os.path.join(path, self.name)
+
+        self.config = config
+        self.bucket_size = bucket_size
+        self.render_plan = None
+
+        network = ip_network(self.config[ConfigKeys.DATA_LINK_NETWORK])
+        self.subnet_len = self.config[ConfigKeys.DATA_LINK_SUBNET_LEN]
+        self.network_base = int(network.network_address)
+        self.subnet_size = 1 << (32 - self.subnet_len)
+        self.subnet_count = 1 << (self.subnet_len - network.prefixlen)
+
+    def use_render_plan(self, render_plan):
+        self.render_plan = render_plan
+
+    def _get_interface_pair(self, k: int) -> Tuple[IPv4Interface, IPv4Interface]:
+        if k >= self.subnet_count:
+            raise RuntimeError(f"Link {k} does not fit in {self.config[ConfigKeys.DATA_LINK_NETWORK]}")
+
+        subnet = self.network_base + k * self.subnet_size
+        return IPv4Interface((subnet + 1, self.subnet_len)), IPv4Interface((subnet + 2, self.subnet_len))
+
+    def _render_node(self, node: DataNode) -> str:
+        if self.render_plan is not None:
+            return self.render_plan.render_data_node(node)
+
+        config_writer = ConfigWriter(node.hostname)
+        node.write_config(config_writer)
+        config_writer.new_line()
+        return config_writer.__str__()
+
+    def _build_bucket(self, start: int, node_identifiers: List[Tuple[str, str, str]],
+                      records: array) -> List[DataNode]:
+        cdp = self.config[ConfigKeys.CDP]
+        nodes = [
+            DataNode(hostname, IPv4Address(identifier), IPv4Interface(mgmt), cdp)
+            for hostname, identifier, mgmt in node_identifiers
+        ]
+        end = start + len(nodes)
+
+        for position in range(0, len(records), 3):
+            k, i, j = records[position:position + 3]
+            for node, local in ((i, True), (j, False)):
+                if start // self.bucket_size != node // self.bucket_size:
+                    continue
+                if node >= end:
+                    raise RuntimeError(f"Link {k} ({i}, {j}) refers to unknown node {node}")
+
+                endpoint_i, endpoint_j = self._get_interface_pair(k)
+                nodes[node - start].create_new_data_link(endpoint_i if local else endpoint_j, cdp, description=None)
+
+        return nodes
+
+    def write_config(self, node_identifiers: Iterable[Tuple[str, str, str]],
+                     links: Iterable[Tuple[int, int]]) -> int:
+        os.makedirs(self.path, exist_ok=True)
+        written = 0
+
+        with tempfile.TemporaryDirectory() as spill_path:
+            link_buckets = LinkBuckets(spill_path, self.bucket_size)
+            for k, (i, j) in enumerate(links):
+                link_buckets.add_link(k, i, j)
+            link_buckets.flush()
+
+            node_identifiers = iter(node_identifiers)
+            bucket = 0
+            while True:
+                chunk = list(islice(node_identifiers, self.bucket_size))
+                if not chunk:
+                    break
+
+                for node in self._build_bucket(bucket * self.bucket_size, chunk, link_buckets.read(bucket)):
+                    with open(os.path.join(self.path, f"{node.hostname}.conf"), "w") as config_file:
+                        config_file.write(self._render_node(node))
+                    written += 1
+                bucket += 1
+
+            if link_buckets.last_bucket >= bucket:
+                raise RuntimeError(f"Links refer to nodes beyond the {written} given")
+
+        return written
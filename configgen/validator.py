@@ -0,0 +1,459 @@
+from bisect import bisect_left, bisect_right, insort
+from ipaddress import IPv4Address, IPv4Interface
+from typing import List, Tuple, Dict, Callable, Optional, Iterable
+from .constants import *
+
+
+class TopologyConflict:
+    def __init__(self, kind: ConflictKind, message: str,
+                 nodes: List[int] = None, links: List[Tuple[int, int]] = None) -> None:
+        self.kind = kind
+        self.message = message
+        self.nodes = nodes or []
+        self.links = links or []
+
+    def __str__(self) -> str:
+        return f"[{self.kind}] {self.message}"
+
+    def __repr__(self) -> str:
+        return f"TopologyConflict({self.kind!r}, {self.message!r})"
+
+
+class TopologyValidationError(RuntimeError):
+    def __init__(self, conflicts: List[TopologyConflict]) -> None:
+        self.conflicts = conflicts
+        super().__init__(
+            f"Topology has {len(conflicts)} conflict(s):\n" +
+            "\n".join(str(conflict) for conflict in conflicts)
+        )
+
+
+class TopologyValidator:
+    """
+    Checks a point to point topology (and optionally the ISIS descriptors built on top of it)
+    for duplicate addresses, data link subnets covering a node identity or management address
+    and links that do not exist. Addresses are compared as sorted integer keys, so the whole
+    pass is O(n log n) in the number of nodes and links.
+    """
+
+    @staticmethod
+    def _sorted_runs(keys: List[int], members: List[int]) -> List[List[int]]:
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        runs = []
+        start = 0
+        for position in range(1, len(order) + 1):
+            if position == len(order) or keys[order[position]] != keys[order[start]]:
+                if position - start > 1:
+                    runs.append([members[order[k]] for k in range(start, position)])
+                start = position
+
+        return runs
+
+    @staticmethod
+    def _address_range(network) -> Tuple[int, int]:
+        # IPv4Interface derives from IPv4Address, so it has to be told apart first
+        if isinstance(network, IPv4Interface):
+            network = network.network
+            return int(network.network_address), int(network.broadcast_address)
+        return int(network), int(network)
+
+    def __init__(self, point_to_point_topology) -> None:
+        self.topology = point_to_point_topology
+        self.nodes = point_to_point_topology.nodes
+
+    def _describe_node(self, i: int) -> str:
+        return f"{self.nodes[i].hostname} ({i})"
+
+    def _describe_link(self, i: int, j: int) -> str:
+        return f"{self._describe_node(i)} -> {self._describe_node(j)}"
+
+    def _has_node(self, i) -> bool:
+        return isinstance(i, int) and 0 <= i < len(self.nodes)
+
+    def _check_hostnames(self, conflicts: List[TopologyConflict]):
+        hostname_index: Dict[str, List[int]] = {}
+        for i, node in enumerate(self.nodes):
+            hostname_index.setdefault(node.hostname, []).append(i)
+
+        for hostname, indices in hostname_index.items():
+            if len(indices) > 1:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.DUPLICATE_HOSTNAME,
+                    f"hostname {hostname} used by nodes {indices}",
+                    nodes=indices
+                ))
+
+    def _check_node_addresses(self, conflicts: List[TopologyConflict], kind: ConflictKind,
+                              label: str, get_address: Callable[[object], Optional[IPv4Address]]):
+        keys, members = [], []
+        for i, node in enumerate(self.nodes):
+            address = get_address(node)
+            if address is not None:
+                keys.append(int(address))
+                members.append(i)
+
+        for run in self._sorted_runs(keys, members):
+            conflicts.append(TopologyConflict(
+                kind,
+                f"{label} {get_address(self.nodes[run[0]])} assigned to nodes " +
+                ", ".join(self._describe_node(i) for i in run),
+                nodes=run
+            ))
+
+    def _check_links(self, conflicts: List[TopologyConflict]):
+        links = self.topology.links
+        link_index: Dict[Tuple[int, int], int] = {}
+
+        for k, (i, j) in enumerate(links):
+            if i == j:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.SELF_LINK,
+                    f"link {k} connects {self._describe_node(i)} to itself",
+                    nodes=[i], links=[(i, j)]
+                ))
+
+            key = (i, j) if i < j else (j, i)
+            if key in link_index:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.DUPLICATE_LINK,
+                    f"links {link_index[key]} and {k} both connect {self._describe_link(i, j)}",
+                    nodes=[i, j], links=[(i, j)]
+                ))
+            else:
+                link_index[key] = k
+
+    def _check_link_subnets(self, conflicts: List[TopologyConflict]):
+        starts, ends = [], []
+        for interface_i, _ in self.topology.link_interfaces:
+            start, end = self._address_range(interface_i.network)
+            starts.append(start)
+            ends.append(end)
+
+        links = self.topology.links
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        widest = None
+        for k in order:
+            if widest is not None and starts[k] <= ends[widest]:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.OVERLAPPING_SUBNET,
+                    f"subnet of link {k} {self._describe_link(*links[k])} overlaps "
+                    f"subnet of link {widest} {self._describe_link(*links[widest])}",
+                    nodes=[*links[k], *links[widest]], links=[links[k], links[widest]]
+                ))
+            if widest is None or ends[k] > ends[widest]:
+                widest = k
+
+    def _node_addresses(self, nodes: Iterable[int]) -> List[Tuple[int, str, int]]:
+        addresses = []
+        for i in nodes:
+            node = self.nodes[i]
+            if node.identity is not None:
+                addresses.append((int(node.identity), f"identity {node.identity}", i))
+            if node.mgmt:
+                addresses.append((int(node.mgmt.ip), f"management address {node.mgmt.ip}", i))
+
+        return addresses
+
+    def _address_overlap(self, k: int, label: str, i: int) -> TopologyConflict:
+        link = self.topology.links[k]
+        return TopologyConflict(
+            ConflictKind.OVERLAPPING_SUBNET,
+            f"subnet of link {k} {self._describe_link(*link)} overlaps {label} of {self._describe_node(i)}",
+            nodes=[i, *link], links=[link]
+        )
+
+    def _check_address_overlaps(self, conflicts: List[TopologyConflict], subnets: List[Tuple[int, int, int]],
+                                addresses: List[Tuple[int, str, int]]):
+        intervals = [(start, False, end, k) for start, end, k in subnets]
+        intervals.extend((address, True, label, i) for address, label, i in addresses)
+        intervals.sort(key=lambda interval: interval[:2])
+
+        widest = None
+        for start, is_address, end, member in intervals:
+            if not is_address:
+                if widest is None or end > widest[0]:
+                    widest = (end, member)
+            elif widest is not None and start <= widest[0]:
+                conflicts.append(self._address_overlap(widest[1], end, member))
+
+    def _check_node_link_overlaps(self, conflicts: List[TopologyConflict]):
+        subnets = [
+            (*self._address_range(interface_i.network), k)
+            for k, (interface_i, _) in enumerate(self.topology.link_interfaces)
+        ]
+        self._check_address_overlaps(conflicts, subnets, self._node_addresses(range(len(self.nodes))))
+
+    def _check_loopback_ranges(self, conflicts: List[TopologyConflict]):
+        intervals: List[Tuple[int, int, str, List[int], bool]] = []
+        for i, node in enumerate(self.nodes):
+            for loopback_range in node.loopback_ranges:
+                start = int(loopback_range.base)
+                end = start + (loopback_range.count << (32 - loopback_range.prefix_len)) - 1
+                intervals.append((start, end, f"loopback range {loopback_range.base} x{loopback_range.count} "
+                                  f"of {self._describe_node(i)}", [i], True))
+
+        if not intervals:
+            return
+
+        for i, node in enumerate(self.nodes):
+            for interface in node.interfaces:
+                if interface.type != InterfaceTypes.MGMT:
+                    start, end = self._address_range(interface.network)
+                    intervals.append((start, end, f"{interface.name} of {self._describe_node(i)}", [i], False))
+
+        intervals.sort(key=lambda interval: interval[0])
+        widest = None
+        for interval in intervals:
+            if widest is not None and interval[0] <= widest[1] and (interval[4] or widest[4]):
+                conflicts.append(TopologyConflict(
+                    ConflictKind.OVERLAPPING_SUBNET,
+                    f"{interval[2]} overlaps {widest[2]}",
+                    nodes=interval[3] + widest[3]
+                ))
+            if widest is None or interval[1] > widest[1]:
+                widest = interval
+
+    def _check_af_metric_descriptor(self, conflicts: List[TopologyConflict],
+                                    af_metric_descriptor: Dict[Tuple[int, int], list]):
+        interface_mapping = self.topology.interface_mapping
+        for i, j in af_metric_descriptor.keys():
+            if (i, j) in interface_mapping:
+                continue
+
+            if not self._has_node(i) or not self._has_node(j):
+                conflicts.append(TopologyConflict(
+                    ConflictKind.UNKNOWN_NODE,
+                    f"ISIS link ({i}, {j}) refers to a node that does not exist",
+                    links=[(i, j)]
+                ))
+            else:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.DANGLING_LINK,
+                    f"ISIS link {self._describe_link(i, j)} has no matching data link",
+                    nodes=[i, j], links=[(i, j)]
+                ))
+
+    def _check_identifier_descriptor(self, conflicts: List[TopologyConflict],
+                                     identifier_af_metric_descriptor: Dict[int, list]):
+        for i in identifier_af_metric_descriptor.keys():
+            if not self._has_node(i):
+                conflicts.append(TopologyConflict(
+                    ConflictKind.UNKNOWN_NODE,
+                    f"ISIS identifier link refers to node {i} which does not exist",
+                    nodes=[i]
+                ))
+
+    def validate(self, af_metric_descriptor: Dict[Tuple[int, int], list] = None,
+                 identifier_af_metric_descriptor: Dict[int, list] = None) -> List[TopologyConflict]:
+        conflicts: List[TopologyConflict] = []
+
+        self._check_hostnames(conflicts)
+        self._check_node_addresses(conflicts, ConflictKind.DUPLICATE_IDENTITY, "identity",
+                                   lambda node: node.identity)
+        self._check_node_addresses(conflicts, ConflictKind.DUPLICATE_MGMT, "management address",
+                                   lambda node: node.mgmt.ip if node.mgmt else None)
+        self._check_links(conflicts)
+        self._check_link_subnets(conflicts)
+        self._check_node_link_overlaps(conflicts)
+        self._check_loopback_ranges(conflicts)
+
+        if af_metric_descriptor:
+            self._check_af_metric_descriptor(conflicts, af_metric_descriptor)
+        if identifier_af_metric_descriptor:
+            self._check_identifier_descriptor(conflicts, identifier_af_metric_descriptor)
+
+        return conflicts
+
+    def check(self, af_metric_descriptor: Dict[Tuple[int, int], list] = None,
+              identifier_af_metric_descriptor: Dict[int, list] = None):
+        conflicts = self.validate(af_metric_descriptor, identifier_af_metric_descriptor)
+        if conflicts:
+            raise TopologyValidationError(conflicts)
+
+    def check_descriptors(self, af_metric_descriptor: Dict[Tuple[int, int], list] = None,
+                          identifier_af_metric_descriptor: Dict[int, list] = None):
+        conflicts: List[TopologyConflict] = []
+        if af_metric_descriptor:
+            self._check_af_metric_descriptor(conflicts, af_metric_descriptor)
+        if identifier_af_metric_descriptor:
+            self._check_identifier_descriptor(conflicts, identifier_af_metric_descriptor)
+
+        if conflicts:
+            raise TopologyValidationError(conflicts)
+
+
+class IncrementalValidator(TopologyValidator):
+    """
+    Validates a topology that only grows, such as the one kept in memory by the render
+    daemon. After a clean full pass, index() keeps the hostnames, node addresses, links and
+    link subnets in hash and sorted indexes; validate_new() then checks only the nodes and links
+    added since the last clean check against them, at O(log n) each, and indexes them if
+    they pass. Loopback ranges and ISIS descriptors are left to the full pass.
+    """
+
+    def __init__(self, point_to_point_topology) -> None:
+        super().__init__(point_to_point_topology)
+        self.checked_nodes: int = None
+        self.checked_links = 0
+        self.hostnames: Dict[str, int] = {}
+        self.identities: Dict[int, int] = {}
+        self.mgmt_addresses: Dict[int, int] = {}
+        self.link_index: Dict[Tuple[int, int], int] = {}
+        self.subnet_starts: List[int] = []
+        self.subnet_ends: List[int] = []
+        self.subnet_links: List[int] = []
+        self.node_addresses: List[Tuple[int, str, int]] = []
+
+    @property
+    def indexed(self) -> bool:
+        return self.checked_nodes is not None
+
+    def _check_key(self, conflicts: List[TopologyConflict], index: Dict, new_index: Dict, key, i: int,
+                   kind: ConflictKind, label: str):
+        other = index.get(key, new_index.get(key))
+        if other is None:
+            new_index[key] = i
+            return
+
+        conflicts.append(TopologyConflict(
+            kind,
+            f"{label} assigned to nodes {self._describe_node(other)}, {self._describe_node(i)}",
+            nodes=[other, i]
+        ))
+
+    def _check_new_nodes(self, conflicts: List[TopologyConflict], nodes: range) -> Tuple[Dict, Dict, Dict]:
+        hostnames, identities, mgmt_addresses = {}, {}, {}
+        for i in nodes:
+            node = self.nodes[i]
+            self._check_key(conflicts, self.hostnames, hostnames, node.hostname, i,
+                            ConflictKind.DUPLICATE_HOSTNAME, f"hostname {node.hostname}")
+            if node.identity is not None:
+                self._check_key(conflicts, self.identities, identities, int(node.identity), i,
+                                ConflictKind.DUPLICATE_IDENTITY, f"identity {node.identity}")
+            if node.mgmt:
+                self._check_key(conflicts, self.mgmt_addresses, mgmt_addresses, int(node.mgmt.ip), i,
+                                ConflictKind.DUPLICATE_MGMT, f"management address {node.mgmt.ip}")
+
+        return hostnames, identities, mgmt_addresses
+
+    def _indexed_subnet(self, start: int, end: int) -> Optional[int]:
+        position = bisect_right(self.subnet_starts, end) - 1
+        if position >= 0 and self.subnet_ends[position] >= start:
+            return self.subnet_links[position]
+        return None
+
+    def _check_new_links(self, conflicts: List[TopologyConflict],
+                         links: range) -> Tuple[Dict, List[Tuple[int, int, int]]]:
+        link_index = {}
+        subnets = []
+        for k in links:
+            i, j = self.topology.links[k]
+            if i == j:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.SELF_LINK,
+                    f"link {k} connects {self._describe_node(i)} to itself",
+                    nodes=[i], links=[(i, j)]
+                ))
+
+            key = (i, j) if i < j else (j, i)
+            other = self.link_index.get(key, link_index.get(key))
+            if other is not None:
+                conflicts.append(TopologyConflict(
+                    ConflictKind.DUPLICATE_LINK,
+                    f"links {other} and {k} both connect {self._describe_link(i, j)}",
+                    nodes=[i, j], links=[(i, j)]
+                ))
+            else:
+                link_index[key] = k
+
+            start, end = self._address_range(self.topology.link_interfaces[k][0].network)
+            subnets.append((start, end, k))
+
+        subnets.sort()
+        widest = None
+        for start, end, k in subnets:
+            other = self._indexed_subnet(start, end)
+            if other is None and widest is not None and start <= widest[1]:
+                other = widest[2]
+            if other is not None:
+                links_k, links_other = self.topology.links[k], self.topology.links[other]
+                conflicts.append(TopologyConflict(
+                    ConflictKind.OVERLAPPING_SUBNET,
+                    f"subnet of link {k} {self._describe_link(*links_k)} overlaps "
+                    f"subnet of link {other} {self._describe_link(*links_other)}",
+                    nodes=[*links_k, *links_other], links=[links_k, links_other]
+                ))
+            if widest is None or end > widest[1]:
+                widest = (start, end, k)
+
+        return link_index, subnets
+
+    def _add_subnets(self, subnets: List[Tuple[int, int, int]]):
+        if not self.subnet_starts:
+            self.subnet_starts = [start for start, _, _ in subnets]
+            self.subnet_ends = [end for _, end, _ in subnets]
+            self.subnet_links = [k for _, _, k in subnets]
+            return
+
+        for start, end, k in subnets:
+            position = bisect_left(self.subnet_starts, start)
+            self.subnet_starts.insert(position, start)
+            self.subnet_ends.insert(position, end)
+            self.subnet_links.insert(position, k)
+
+    def _check_new_overlaps(self, conflicts: List[TopologyConflict], subnets: List[Tuple[int, int, int]],
+                            addresses: List[Tuple[int, str, int]]):
+        self._check_address_overlaps(conflicts, subnets, addresses)
+
+        for address, label, i in addresses:
+            k = self._indexed_subnet(address, address)
+            if k is not None:
+                conflicts.append(self._address_overlap(k, label, i))
+
+        for start, end, k in subnets:
+            position = bisect_left(self.node_addresses, (start,))
+            while position < len(self.node_addresses) and self.node_addresses[position][0] <= end:
+                _, label, i = self.node_addresses[position]
+                conflicts.append(self._address_overlap(k, label, i))
+                position += 1
+
+    def _add_node_addresses(self, addresses: List[Tuple[int, str, int]]):
+        if not self.node_addresses:
+            self.node_addresses = sorted(addresses)
+            return
+
+        for address in addresses:
+            insort(self.node_addresses, address)
+
+    def _check_new(self, conflicts: List[TopologyConflict]):
+        nodes = range(self.checked_nodes or 0, len(self.nodes))
+        links = range(self.checked_links, len(self.topology.links))
+        hostnames, identities, mgmt_addresses = self._check_new_nodes(conflicts, nodes)
+        link_index, subnets = self._check_new_links(conflicts, links)
+        addresses = self._node_addresses(nodes)
+        self._check_new_overlaps(conflicts, subnets, addresses)
+        if conflicts:
+            return
+
+        self.hostnames.update(hostnames)
+        self.identities.update(identities)
+        self.mgmt_addresses.update(mgmt_addresses)
+        self.link_index.update(link_index)
+        self._add_subnets(subnets)
+        self._add_node_addresses(addresses)
+        self.checked_nodes, self.checked_links = len(self.nodes), len(self.topology.links)
+
+    def index(self):
+        """
+        Indexes the whole topology, which a full validation pass has found clean.
+        """
+        conflicts: List[TopologyConflict] = []
+        self._check_new(conflicts)
+        if conflicts:
+            raise TopologyValidationError(conflicts)
+
+    def validate_new(self) -> List[TopologyConflict]:
+        assert self.indexed, "The topology has to be indexed after a full validation pass first"
+        conflicts: List[TopologyConflict] = []
+        self._check_new(conflicts)
+        return conflicts
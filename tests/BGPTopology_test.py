@@ -0,0 +1,40 @@
+import unittest
+from ipaddress import IPv4Address, IPv4Interface
+from configgen.constants import *
+from configgen.config_writer import ConfigWriter
+from configgen.point_to_point_topology import DataNode
+from configgen.isis_topology import ISISNode
+from configgen.bgp_topology import BGPNode
+
+
+class BGPNodeTest(unittest.TestCase):
+    @staticmethod
+    def _bgp_node() -> BGPNode:
+        data_node = DataNode("xr1", IPv4Address("1.1.1.1"), IPv4Interface("192.168.0.120/24"))
+        return BGPNode(ISISNode(data_node, ISLevel.LEVEL_2, "core"), 65000)
+
+    @staticmethod
+    def _render(bgp_node: BGPNode) -> str:
+        config_writer = ConfigWriter("test")
+        bgp_node.igp_node.data_node.write_config(config_writer)
+        bgp_node.write_config(config_writer)
+        return config_writer.__str__()
+
+    def test_prefix_range(self):
+        eager_node = self._bgp_node()
+        for k in range(4):
+            address = IPv4Interface(f"10.0.0.{k * 4}/30")
+            eager_node._add_prefix(address, address.network, [AddressFamily.IPv4_UNICAST])
+
+        lazy_node = self._bgp_node()
+        prefix_range = lazy_node._add_prefix_range(IPv4Address("10.0.0.0"), 4,
+                                                   [AddressFamily.IPv4_UNICAST], prefix_len=30)
+
+        self.assertEqual(len(lazy_node.igp_node.data_node.interfaces), 2)
+        self.assertEqual(lazy_node.igp_node.data_node.next_loopback, 5)
+        self.assertEqual([str(network) for network in prefix_range.networks()][-1], "10.0.0.12/30")
+        self.assertMultiLineEqual(self._render(lazy_node), self._render(eager_node))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from configgen.constants import *
+from configgen.bundle import ConfigBundle
+from tests.helpers import OfflineDeployer, sample_isis_topology
+
+
+class ConfigBundleTest(unittest.TestCase):
+    def test_bundle_formats(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = sample_isis_topology(path)
+            topo.write_config()
+
+            for bundle_format in BundleFormat:
+                bundle_path = topo.write_bundle(bundle_format)
+                self.assertTrue(bundle_path.endswith("." + str(bundle_format)))
+
+                with ConfigBundle(bundle_path) as bundle:
+                    self.assertEqual(bundle.bundle_format, bundle_format)
+                    self.assertEqual(sorted(bundle.hostnames()), ["xr1", "xr2", "xr3"])
+
+                    for hostname in bundle.hostnames():
+                        with open(os.path.join(topo.point_to_point_topology.path, f"{hostname}.conf")) as f:
+                            self.assertMultiLineEqual(bundle.read(hostname), f.read())
+
+    def test_deployer_reads_bundle(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = sample_isis_topology(path)
+            bundle = ConfigBundle(topo.write_bundle())
+
+            deployer = OfflineDeployer(path, "localhost", {"xr1": 5000}, bundle=bundle)
+            self.assertEqual(deployer._read_configs("xr2"), topo._render_node(1))
+
+            deployer = OfflineDeployer(path, "localhost", {"xr1": 5000, "xr9": 5009}, bundle=bundle)
+            self.assertIn("xr9 is not in bundle", deployer.deploy_host("xr9"))
+
+
+if __name__ == '__main__':
+    unittest.main()
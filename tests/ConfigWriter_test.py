@@ -0,0 +1,73 @@
+import unittest
+from configgen.config_writer import ConfigWriter, LinePool
+from tests.helpers import sample_isis_topology
+
+
+class ConfigWriterTest(unittest.TestCase):
+    @staticmethod
+    def _write(config_writer: ConfigWriter, address: str) -> ConfigWriter:
+        config_writer.add_config("interface Loopback 0")
+        config_writer.indent()
+        config_writer.add_config(["no shutdown", f"ipv4 address {address}"])
+        config_writer.unindent()
+        return config_writer
+
+    @staticmethod
+    def _write_isis(config_writer: ConfigWriter, net: str) -> ConfigWriter:
+        config_writer.add_config("router isis core")
+        config_writer.indent()
+        config_writer.add_config(f"net {net}")
+        config_writer.add_config("interface Loopback 0")
+        config_writer.indent()
+        config_writer.add_config("passive")
+        config_writer.line_return()
+        config_writer.new_line()
+        return config_writer
+
+    def test_line_pool(self):
+        line_pool = LinePool()
+        first = self._write(ConfigWriter("xr1", line_pool), "1.1.1.1/32")
+        second = self._write(ConfigWriter("xr2", line_pool), "2.2.2.2/32")
+
+        self.assertMultiLineEqual(first.__str__(), self._write(ConfigWriter("xr1"), "1.1.1.1/32").__str__())
+        self.assertIs(first.lines()[1], second.lines()[1])
+        self.assertIs(first.lines()[3], second.lines()[3])
+        self.assertIsNot(first.lines()[2], second.lines()[2])
+        self.assertEqual(len(line_pool), 5)
+
+    def test_block_pool(self):
+        line_pool = LinePool()
+        first = self._write_isis(ConfigWriter("xr1", line_pool), "49.0001.0010.0100.1001.00")
+        second = self._write_isis(ConfigWriter("xr2", line_pool), "49.0001.0020.0200.2002.00")
+
+        self.assertMultiLineEqual(first.__str__(),
+                                  self._write_isis(ConfigWriter("xr1"), "49.0001.0010.0100.1001.00").__str__())
+        self.assertEqual(len(first._items), 5)
+        self.assertIsInstance(first._items[2], tuple)
+        self.assertIs(first._items[2], second._items[2])
+        self.assertIsNot(first._items[1], second._items[1])
+        self.assertTrue(all(isinstance(line, str) for line in first.config_lines))
+        self.assertEqual(first.config_lines, first.__str__().split("\n"))
+        self.assertEqual(len(line_pool.blocks), 1)
+
+        line_pool.clear()
+        self.assertEqual((len(line_pool), len(line_pool.blocks)), (0, 0))
+
+    def test_bounded_pool(self):
+        line_pool = LinePool(max_entries=4)
+        writers = [self._write(ConfigWriter(f"xr{n}", line_pool), f"{n}.{n}.{n}.{n}/32") for n in range(1, 4)]
+
+        self.assertEqual(len(line_pool) + len(line_pool.blocks), 4)
+        self.assertEqual(writers[2].__str__(), self._write(ConfigWriter("xr3"), "3.3.3.3/32").__str__())
+
+    def test_render_writers(self):
+        topo = sample_isis_topology(size=2)
+
+        line_pool = LinePool()
+        for writers in (topo.render_writers(), topo.render_writers(line_pool)):
+            self.assertEqual([writer.__str__() for writer in writers], [topo._render_node(i) for i in range(2)])
+        self.assertGreater(len(line_pool.blocks), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+from configgen.deployer import Deployer
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.scheduler import DeployScheduler, DEFAULT_MAX_PER_WAVE
+
+
+class RecordingDeployer(Deployer):
+    def __init__(self, host_ports, host_namespaces, failing=(), errors=None):
+        super().__init__("../topo-dump", "ts0", host_ports, host_namespaces=host_namespaces)
+        self.failing = set(failing)
+        self.errors = errors or {}
+        self.deployed = []
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def _check_topology(self):
+        pass
+
+    def _deploy_host(self, hostname: str):
+        namespace = self.get_namespace(hostname)
+        with self.lock:
+            self.active[namespace] = self.active.get(namespace, 0) + 1
+            self.peak[namespace] = max(self.peak.get(namespace, 0), self.active[namespace])
+        time.sleep(0.01)
+        with self.lock:
+            self.active[namespace] -= 1
+            self.deployed.append(hostname)
+
+        if hostname in self.errors:
+            raise self.errors[hostname]
+        if hostname in self.failing:
+            raise RuntimeError(f"{hostname} refused the configuration")
+
+
+class DeploySchedulerTest(unittest.TestCase):
+    @staticmethod
+    def _star_topology() -> PointToPointTopology:
+        topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        topo.generate_point_to_point_topology(
+            [(f"xr{n}", f"10.0.0.{n + 1}", f"192.168.0.{n + 1}/24") for n in range(7)],
+            [(0, 1), (0, 2), (0, 3), (1, 4), (2, 5), (3, 6)]
+        )
+        return topo
+
+    def test_waves(self):
+        topo = self._star_topology()
+        deployer = RecordingDeployer({f"xr{n}": 5000 + n for n in range(7)}, {})
+
+        waves = DeployScheduler(deployer, topo).build_waves()
+        self.assertEqual([sorted(wave) for wave in waves],
+                         [["xr0"], ["xr1", "xr2", "xr3"], ["xr4", "xr5", "xr6"]])
+
+        waves = DeployScheduler(deployer, topo, seeds=["xr4"]).build_waves()
+        self.assertEqual(waves[0], ["xr4"])
+
+    def test_namespace_limit(self):
+        topo = self._star_topology()
+        deployer = RecordingDeployer(
+            {f"xr{n}": 5000 + n for n in range(7)},
+            {f"xr{n}": f"ts{n % 2}" for n in range(7)}
+        )
+
+        failures = DeployScheduler(deployer, topo, max_per_namespace=1).deploy()
+        self.assertEqual(failures, {})
+        self.assertEqual(deployer.deployed[0], "xr0")
+        self.assertEqual(sorted(deployer.deployed), [f"xr{n}" for n in range(7)])
+        self.assertEqual(deployer.peak, {"ts0": 1, "ts1": 1})
+
+    def test_failure_threshold(self):
+        topo = self._star_topology()
+        deployer = RecordingDeployer({f"xr{n}": 5000 + n for n in range(7)}, {},
+                                     failing=["xr1", "xr2"])
+
+        failures = DeployScheduler(deployer, topo, failure_threshold=2).deploy()
+        self.assertEqual(sorted(deployer.deployed), ["xr0", "xr1", "xr2", "xr3"])
+        for hostname in ["xr4", "xr5", "xr6"]:
+            self.assertEqual(failures[hostname], DeployScheduler.SKIPPED)
+
+    def test_connection_errors(self):
+        topo = self._star_topology()
+        deployer = RecordingDeployer({f"xr{n}": 5000 + n for n in range(7)}, {}, errors={
+            "xr1": ConnectionRefusedError(111, "Connection refused"),
+            "xr2": EOFError("telnet connection closed"),
+        })
+
+        failures = DeployScheduler(deployer, topo, failure_threshold=2).deploy()
+        self.assertIn("Connection refused", failures["xr1"])
+        self.assertEqual(failures["xr2"], "telnet connection closed")
+        for hostname in ["xr4", "xr5", "xr6"]:
+            self.assertEqual(failures[hostname], DeployScheduler.SKIPPED)
+
+        self.assertEqual(deployer.deploy_host("xr1"), failures["xr1"])
+
+    def test_wave_cap(self):
+        size = DEFAULT_MAX_PER_WAVE + 8
+        topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        topo.generate_point_to_point_topology(
+            [(f"xr{n}", f"10.0.{n >> 8}.{n & 255}", f"192.168.{n >> 8}.{n & 255}/16") for n in range(size)],
+            [(0, n) for n in range(1, size)]
+        )
+        deployer = RecordingDeployer({f"xr{n}": 5000 + n for n in range(size)}, {})
+
+        self.assertEqual(DeployScheduler(deployer, topo).deploy(), {})
+        self.assertEqual(len(deployer.deployed), size)
+        self.assertLessEqual(deployer.peak["ts0"], DEFAULT_MAX_PER_WAVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import socket
+import tempfile
+import unittest
+from configgen.audit import DriftAuditor, compare_configs
+from configgen.bundle import ConfigBundle
+from configgen.deployer import CleanTelnet, Deployer
+from tests.helpers import OfflineDeployer, sample_isis_topology
+
+RUNNING_CONFIG = (
+    "show running-config\r\n"
+    "Mon Oct 19 10:00:00.000 UTC\r\n"
+    "Building configuration...\r\n"
+    "!! IOS XR Configuration 7.3.2\r\n"
+    "!! Last configuration change at Mon Oct 19 09:58:12 2026 by admin\r\n"
+    "!\r\n"
+    "hostname xr1\r\n"
+    "cdp\r\n"
+    "line console\r\n"
+    " exec-timeout 0 0\r\n"
+    "!\r\n"
+    "interface Loopback0\r\n"
+    " ipv4 address 1.1.1.1 255.255.255.255\r\n"
+    "!\r\n"
+    "interface MgmtEth0/RP0/CPU0/0\r\n"
+    " ipv4 address 192.168.0.120 255.255.255.0\r\n"
+    "!\r\n"
+    "interface GigabitEthernet0/0/0/0\r\n"
+    " cdp\r\n"
+    " ipv4 address 172.50.0.1 255.255.255.0\r\n"
+    "!\r\n"
+    "router isis core\r\n"
+    " is-type level-2-only\r\n"
+    " net 49.0001.0010.0100.1001.00\r\n"
+    " address-family ipv4 unicast\r\n"
+    "  metric-style wide\r\n"
+    " !\r\n"
+    " interface Loopback0\r\n"
+    "  passive\r\n"
+    "  address-family ipv4 unicast\r\n"
+    "   metric 1\r\n"
+    "  !\r\n"
+    " !\r\n"
+    " interface GigabitEthernet0/0/0/0\r\n"
+    "  point-to-point\r\n"
+    "  address-family ipv4 unicast\r\n"
+    "   metric {metric}\r\n"
+    "  !\r\n"
+    " !\r\n"
+    "!\r\n"
+    "end\r\n"
+)
+
+PROMPT = "RP/0/RP0/CPU0:xr1#"
+
+ROUTE_POLICY = (
+    "route-policy PASS-ALL\r\n"
+    "  pass\r\n"
+    "end-policy\r\n"
+    "!\r\n"
+)
+
+
+class CapturedTelnet(CleanTelnet):
+    """
+    A telnet session over a local socket pair: every command written to it is answered
+    with its captured output, which the real telnet reading code then parses.
+    """
+
+    def __init__(self, replies: dict, timeout: float):
+        super().__init__(None, 0, timeout)
+        self.sock, self.router = socket.socketpair()
+        self.replies = replies
+
+    def write(self, buffer: bytes):
+        command = buffer.decode("utf-8").strip()
+        self.router.sendall(self.replies.get(command, f"{command}\r\n{PROMPT}").encode("utf-8"))
+
+    def close(self):
+        super().close()
+        self.router.close()
+
+
+class CapturedDeployer(OfflineDeployer):
+    def __init__(self, *args, running_config: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running_config = running_config
+
+    def _open_session(self, hostname: str, timeout: int = Deployer.DEFAULT_TIMEOUT) -> CapturedTelnet:
+        return CapturedTelnet({"show running-config": self.running_config}, timeout)
+
+
+class FakeDriftAuditor(DriftAuditor):
+    def __init__(self, deployer: Deployer, running_configs: dict):
+        super().__init__(deployer)
+        self.running_configs = running_configs
+
+    def _fetch_running_config(self, hostname: str) -> str:
+        if hostname not in self.running_configs:
+            raise RuntimeError(f"Connection to {hostname} refused")
+        return self.running_configs[hostname]
+
+
+class DriftAuditorTest(unittest.TestCase):
+    def test_compare(self):
+        rendered = sample_isis_topology(size=2)._render_node(0)
+
+        report = compare_configs("xr1", rendered, RUNNING_CONFIG.replace("{metric}", "10"))
+        self.assertTrue(report.in_sync, str(report))
+        self.assertEqual(report.unexpected, ["line console"])
+
+        report = compare_configs("xr1", rendered, RUNNING_CONFIG.replace("{metric}", "20"))
+        self.assertFalse(report.in_sync)
+        self.assertEqual(report.changed, ["router isis core"])
+        self.assertEqual(report.missing, [])
+
+    def test_audit(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = sample_isis_topology(path, size=2)
+            bundle = ConfigBundle(topo.write_bundle())
+            deployer = OfflineDeployer(path, "localhost", {"xr1": 5000, "xr2": 5001}, bundle=bundle)
+
+            reports = FakeDriftAuditor(deployer, {
+                "xr1": RUNNING_CONFIG.replace("{metric}", "10")
+            }).audit()
+
+            self.assertTrue(reports["xr1"].in_sync)
+            self.assertFalse(reports["xr2"].in_sync)
+            self.assertIn("refused", reports["xr2"].error)
+
+    def test_fetch_running_config(self):
+        running_config = RUNNING_CONFIG.replace("{metric}", "10").replace("end\r\n", ROUTE_POLICY + "end\r\n")
+
+        with tempfile.TemporaryDirectory() as path:
+            topo = sample_isis_topology(path, size=2)
+            bundle = ConfigBundle(topo.write_bundle())
+
+            deployer = CapturedDeployer(path, "localhost", {"xr1": 5000}, bundle=bundle,
+                                        running_config=running_config + "\r\n" + PROMPT)
+            auditor = DriftAuditor(deployer, timeout=0.1)
+
+            fetched = auditor._fetch_running_config("xr1")
+            self.assertTrue(fetched.startswith("show running-config\r\n"))
+            self.assertIn("end-policy\r\n", fetched)
+            self.assertNotIn(PROMPT, fetched)
+
+            report = auditor.audit_host("xr1")
+            self.assertTrue(report.in_sync, str(report))
+            self.assertEqual(report.unexpected, ["line console", "route-policy PASS-ALL"])
+
+            deployer.running_config = running_config[:running_config.index("router isis")]
+            report = auditor.audit_host("xr1")
+            self.assertIn("Timed out", report.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from configgen.constants import *
+from configgen.groups import GroupCompressor, parse_config, serialize_config, expand_groups
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.isis_topology import ISISTopology
+
+
+def canonical(blocks) -> list:
+    return sorted((block.line, canonical(block.children) if block.is_block() else None)
+                  for block in blocks)
+
+
+class GroupCompressorTest(unittest.TestCase):
+    @staticmethod
+    def _mesh_topology(path: str) -> ISISTopology:
+        p2p_topo = PointToPointTopology(name="sample-topology", path=path)
+        p2p_topo.generate_point_to_point_topology(
+            [(f"xr{n}", f"10.0.0.{n + 1}", f"192.168.0.{n + 1}/24") for n in range(6)],
+            [(i, j) for i in range(6) for j in range(i + 1, 6)]
+        )
+
+        topo = ISISTopology(p2p_topo, "core", DEFAULT_CONFIGS)
+        topo.generate_isis_topology(
+            {key: [(AddressFamily.IPv4_UNICAST, 10)] for key in p2p_topo.interface_mapping.keys()},
+            {i: [(AddressFamily.IPv4_UNICAST, 1)] for i in range(6)}
+        )
+        return topo
+
+    def test_round_trip(self):
+        topo = self._mesh_topology("../topo-dump")
+        flat = topo._render_node(0)
+        self.assertEqual(serialize_config(parse_config(flat)), flat)
+
+    def test_grouped_semantics(self):
+        topo = self._mesh_topology("../topo-dump")
+        flat = topo._render_node(0)
+        grouped, report = GroupCompressor().compress(flat)
+
+        self.assertEqual(report.groups, 1)
+        self.assertEqual(report.saved_bytes, len(flat) - len(grouped))
+        self.assertTrue(grouped.startswith("group CG-1\n"
+                                           " router isis core\n"
+                                           "  interface 'GigabitEthernet.*'\n"
+                                           "   point-to-point\n"))
+        self.assertIn(" interface GigabitEthernet 0/0/0/0\n  apply-group CG-1\n !", grouped)
+        self.assertIn("interface GigabitEthernet 0/0/0/0\n no shutdown\n cdp\n", grouped)
+        self.assertEqual(canonical(parse_config(expand_groups(grouped))), canonical(parse_config(flat)))
+
+    def test_grouped_write(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = self._mesh_topology(path)
+            reports = topo.write_config(grouped=True)
+
+            for hostname, report in reports.items():
+                with open(os.path.join(topo.point_to_point_topology.path, f"{hostname}.conf")) as f:
+                    self.assertEqual(len(f.read().encode("utf-8")), report.grouped_bytes)
+                self.assertLess(report.grouped_bytes, report.flat_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
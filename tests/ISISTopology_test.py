@@ -1,6 +1,7 @@
+import textwrap
 import unittest
 from configgen.point_to_point_topology import NodeInterface, PointToPointTopology
-from configgen.isis_topology import ISISInterface, ISISTopology
+from configgen.isis_topology import ISISInterface, ISISNode, ISISTopology, LinkMetricMatrix
 from configgen.constants import *
 from ipaddress import IPv4Address, IPv4Interface
 from configgen.config_writer import ConfigWriter
@@ -89,6 +90,70 @@ class ISISTopologyTest(unittest.TestCase):
 
         topo.write_config()
 
+    def test_metric_matrix(self):
+        node_identifiers = [
+            ("xr1", "1.1.1.1", "192.168.0.120/24"),
+            ("xr2", "2.2.2.2", "192.168.0.121/24"),
+            ("xr3", "3.3.3.3", "192.168.0.122/24"),
+        ]
+        links = [(0, 1), (1, 2), (2, 0)]
+        identifiers = {i: [(AddressFamily.IPv4_UNICAST, 1)] for i in range(3)}
+
+        dict_p2p_topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        dict_p2p_topo.generate_point_to_point_topology(node_identifiers, links)
+        dict_topo = ISISTopology(dict_p2p_topo, "core", DEFAULT_CONFIGS)
+        dict_topo.generate_isis_topology({
+            (0, 1): [(AddressFamily.IPv4_UNICAST, 10), (AddressFamily.IPv6_UNICAST, 20)],
+            (1, 0): [(AddressFamily.IPv4_UNICAST, 10), (AddressFamily.IPv6_UNICAST, 20)],
+            (1, 2): [(AddressFamily.IPv4_UNICAST, 30), (AddressFamily.IPv6_UNICAST, 20)],
+            (2, 1): [(AddressFamily.IPv4_UNICAST, 30), (AddressFamily.IPv6_UNICAST, 25)],
+            (2, 0): [(AddressFamily.IPv4_UNICAST, 50), (AddressFamily.IPv6_UNICAST, 20)],
+            (0, 2): [(AddressFamily.IPv4_UNICAST, 50), (AddressFamily.IPv6_UNICAST, 20)],
+        }, identifiers)
+
+        matrix_p2p_topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        matrix_p2p_topo.generate_point_to_point_topology(node_identifiers, links)
+        matrix_topo = ISISTopology(matrix_p2p_topo, "core", DEFAULT_CONFIGS)
+        metric_matrix = LinkMetricMatrix.from_arrays({
+            AddressFamily.IPv4_UNICAST: [10, 30, 50],
+            AddressFamily.IPv6_UNICAST: [20, 20, 20],
+        })
+        metric_matrix.set_direction_metric(AddressFamily.IPv6_UNICAST, 1, True, 25)
+        matrix_topo.generate_isis_topology_from_matrix(metric_matrix, identifiers)
+
+        for i in range(3):
+            self.assertMultiLineEqual(matrix_topo._render_node(i), dict_topo._render_node(i))
+
+        default_matrix = matrix_topo.create_metric_matrix()
+        self.assertEqual(list(default_matrix.iter_metrics(2, reverse=True)),
+                         [(AddressFamily.IPv4_UNICAST, 10)])
+
+    def test_bulk_net_ids(self):
+        identities = [IPv4Address(address) for address in
+                      ("1.1.1.1", "0.0.0.0", "10.20.30.40", "100.0.255.7", "255.255.255.255")]
+        expected = [
+            "49.0001." + ".".join(textwrap.wrap("".join(f"{int(octet):03d}" for octet in str(identity).split(".")), 4))
+            + ".00" for identity in identities
+        ]
+
+        self.assertEqual(ISISNode.generate_net_ids(identities), expected)
+        self.assertEqual(ISISNode.generate_net_ids([identities[2]])[0], "49.0001.0100.2003.0040.00")
+
+        p2p_topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        p2p_topo.generate_point_to_point_topology(
+            [(f"xr{n}", str(identity), f"192.168.0.{n + 1}/24") for n, identity in enumerate(identities)], []
+        )
+        topo = ISISTopology(p2p_topo, "core", DEFAULT_CONFIGS)
+        self.assertEqual([node.net_id for node in topo.nodes], expected)
+        self.assertEqual(ISISNode(p2p_topo.nodes[3], ISLevel.LEVEL_2, "core").net_id, expected[3])
+
+    def test_interface_name_tables(self):
+        for n in (0, 7, NAME_TABLE_SIZE - 1, NAME_TABLE_SIZE, 5 * NAME_TABLE_SIZE):
+            self.assertEqual(get_loopback(n), LOOPBACK_LINK_PREFIX + str(n))
+            self.assertEqual(get_data_link(n), DATA_LINK_PREFIX + str(n))
+        self.assertIs(get_data_link(3), get_data_link(3))
+        self.assertEqual(get_mgmt(0), "MgmtEth 0/RP0/CPU0/0")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from configgen.deployer import Deployer
+from configgen.inventory import Inventory, InventoryEntry
+from tests.helpers import OfflineDeployer, sample_point_to_point_topology
+
+
+class InventoryTest(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as path:
+            inventory_path = os.path.join(path, "inventory.csv")
+            Inventory([
+                InventoryEntry("xr1", "ts0", 5000, "admin", "pass,word"),
+                InventoryEntry("xr2", "ts1", 5001, "admin", "secret"),
+            ]).save(inventory_path)
+
+            inventory = Inventory.load(inventory_path)
+            self.assertEqual(inventory.host_ports(), {"xr1": 5000, "xr2": 5001})
+            self.assertEqual(inventory.host_namespaces(), {"xr1": "ts0", "xr2": "ts1"})
+            self.assertEqual(inventory.get_cred("xr1"), ("admin", "pass,word"))
+
+            deployer = OfflineDeployer(path, inventory=inventory)
+            self.assertEqual(deployer.get_namespace("xr2"), "ts1")
+            self.assertEqual(deployer.inventory.get_cred("xr2"), ("admin", "secret"))
+
+    def test_missing_credentials(self):
+        with tempfile.TemporaryDirectory() as path:
+            inventory_path = os.path.join(path, "inventory.csv")
+            Inventory([
+                InventoryEntry("xr1", "ts0", 5000),
+                InventoryEntry("xr2", "ts0", 5001, "admin", "secret"),
+            ]).save(inventory_path)
+
+            inventory = Inventory.load(inventory_path)
+            self.assertFalse(inventory.has_cred("xr1"))
+            self.assertEqual(inventory.get_cred("xr1"), (None, None))
+            self.assertTrue(inventory.has_cred("xr2"))
+
+            with self.assertRaises(AssertionError):
+                Deployer(path, inventory=inventory)
+
+    def test_cred_file_fallback(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "xr1.cred"), "w") as cred_file:
+                cred_file.write("admin:secret")
+
+            deployer = OfflineDeployer(path, "ts0", {"xr1": 5000, "xr2": 5001})
+            self.assertEqual(deployer.get_namespace("xr1"), "ts0")
+            self.assertTrue(deployer.inventory.has_cred("xr1"))
+            self.assertFalse(deployer.inventory.has_cred("xr2"))
+            self.assertEqual(deployer.inventory.get_cred("xr1"), ("admin", "secret"))
+
+    def test_requires_inventory_or_ports(self):
+        with tempfile.TemporaryDirectory() as path:
+            with self.assertRaises(ValueError):
+                OfflineDeployer(path, "ts0")
+
+    def test_for_topology(self):
+        topo = sample_point_to_point_topology(size=2)
+
+        inventory = Inventory([
+            InventoryEntry("xr1", "ts0", 5000, "admin", "secret"),
+            InventoryEntry("xr2", "ts0", 5001, "admin", "secret"),
+            InventoryEntry("xr9", "ts0", 5009, "admin", "secret"),
+        ])
+        deployer = OfflineDeployer.from_topology(topo, inventory)
+        self.assertEqual(deployer.host_ports, {"xr1": 5000, "xr2": 5001})
+
+        with self.assertRaises(ValueError):
+            OfflineDeployer.from_topology(topo)
+        topo.use_inventory(inventory)
+        self.assertEqual(OfflineDeployer.from_topology(topo).host_ports, {"xr1": 5000, "xr2": 5001})
+
+        with self.assertRaises(AssertionError):
+            inventory.subset(["xr1"]).for_topology(topo)
+
+
+if __name__ == '__main__':
+    unittest.main()
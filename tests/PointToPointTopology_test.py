@@ -1,6 +1,6 @@
 import unittest
 from ipaddress import ip_interface, ip_address
-from configgen.constants import InterfaceTypes
+from configgen.constants import InterfaceTypes, MAX_LOOPBACK
 from configgen.constants import (
     get_mgmt, get_loopback, get_data_link
 )
@@ -93,6 +93,76 @@ class PointToPointTopologyTest(unittest.TestCase):
         )
         topo.write_config()
 
+    def test_lookup_indexes(self):
+        topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        topo.generate_point_to_point_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+                ("xr3", "3.3.3.3", "192.168.0.122/24"),
+            ],
+            [(0, 1), (1, 2)]
+        )
+
+        self.assertEqual(topo.get_node_index("xr2"), 1)
+        self.assertIs(topo.get_node("xr3"), topo.nodes[2])
+        self.assertIsNone(topo.get_node("xr9"))
+
+        self.assertEqual(topo.get_neighbors(1), [0, 2])
+        self.assertEqual(topo.get_neighbors(2), [1])
+
+        self.assertIs(topo.get_interface(1, get_data_link(1)), topo.get_transmit_data_interface(2, 1))
+        self.assertIs(topo.nodes[0].identity_interface, topo.get_interface(0, get_loopback(0)))
+        self.assertEqual(
+            [interface.name for interface in topo.get_interfaces_by_type(1, InterfaceTypes.DATA)],
+            [get_data_link(0), get_data_link(1)]
+        )
+
+        topo.nodes[1].create_new_loopback(ip_address("10.0.0.1"))
+        self.assertEqual(len(topo.get_interfaces_by_type(1, InterfaceTypes.LOOPBACK)), 2)
+        self.assertIs(topo.nodes[1].identity_interface, topo.get_interface(1, get_loopback(0)))
+
+        topo.nodes[1].create_loopback_range(ip_address("10.1.0.0"), 4, prefix_len=31, description="customers")
+        range_interface = topo.get_interface(1, get_loopback(4))
+        self.assertEqual(str(range_interface.network), "10.1.0.4/31")
+        self.assertEqual(range_interface.description, "customers")
+        self.assertIsNone(topo.get_interface(1, get_loopback(6)))
+        self.assertIsNone(topo.get_interface(1, "Loopback x"))
+        self.assertEqual(
+            [interface.name for interface in topo.get_interfaces_by_type(1, InterfaceTypes.LOOPBACK)],
+            [get_loopback(n) for n in range(6)]
+        )
+        self.assertEqual(len(topo.nodes[1].interfaces_by_type[InterfaceTypes.LOOPBACK]), 2)
+
+    def test_loopback_range_order_and_bounds(self):
+        topo = PointToPointTopology(name="sample-topology", path="../topo-dump")
+        topo.generate_point_to_point_topology([("xr1", "1.1.1.1", "192.168.0.120/24")], [])
+        node = topo.nodes[0]
+
+        node.create_loopback_range(ip_address("10.1.0.0"), 2)
+        node.create_new_loopback(ip_address("10.2.0.1"))
+        node.create_loopback_range(ip_address("10.3.0.0"), 2)
+
+        config_writer = ConfigWriter("xr1")
+        node.write_config(config_writer)
+        self.assertEqual(
+            [line for line in config_writer.lines() if line.startswith("interface Loopback")],
+            [f"interface {get_loopback(n)}" for n in range(6)]
+        )
+        self.assertEqual(
+            [interface.name for interface in node.get_interfaces_by_type(InterfaceTypes.LOOPBACK)],
+            [get_loopback(n) for n in range(6)]
+        )
+
+        with self.assertRaises(ValueError):
+            node.create_loopback_range(ip_address("255.255.255.254"), 4)
+        with self.assertRaises(ValueError):
+            node.create_loopback_range(ip_address("10.4.0.0"), 0)
+        node.next_loopback = MAX_LOOPBACK
+        with self.assertRaises(ValueError):
+            node.create_loopback_range(ip_address("10.4.0.0"), 2)
+        node.create_loopback_range(ip_address("10.4.0.0"), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
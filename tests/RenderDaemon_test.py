@@ -0,0 +1,86 @@
+import os
+import socket
+import tempfile
+import unittest
+from configgen.point_to_point_topology import PointToPointTopology
+from tests.helpers import sample_point_to_point_topology, sample_isis_topology
+from configgen.daemon import RenderDaemon, RenderClient
+
+
+class RenderDaemonTest(unittest.TestCase):
+    def test_mutate_and_render(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = sample_isis_topology(path, size=2)
+            p2p_topo = topo.point_to_point_topology
+
+            socket_path = os.path.join(path, "render.sock")
+            daemon = RenderDaemon(topo, socket_path)
+            thread = daemon.start()
+
+            with RenderClient(socket_path) as client:
+                self.assertEqual(client.request("write")["written"], ["xr1", "xr2"])
+                self.assertEqual(client.request("status")["dirty"], [])
+
+                client.request("add_node", hostname="xr3", identity="3.3.3.3", mgmt="192.168.0.122/24",
+                               identifier_metrics=[["ipv4 unicast", 1]])
+                client.request("add_link", i="xr2", j="xr3", metrics=[["ipv4 unicast", 20]])
+                self.assertEqual(client.request("status")["dirty"], ["xr2", "xr3"])
+
+                configs = client.request("render", hosts=["xr3"])["configs"]
+                self.assertIn("  metric 20", configs["xr3"])
+                self.assertEqual(client.request("write")["written"], ["xr2", "xr3"])
+
+                with open(os.path.join(p2p_topo.path, "xr3.conf")) as f:
+                    self.assertMultiLineEqual(f.read(), configs["xr3"])
+
+                with self.assertRaises(RuntimeError):
+                    client.request("add_link", i="xr1", j="xr9")
+
+                client.request("shutdown")
+
+            thread.join(5)
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_incremental_validation(self):
+        with tempfile.TemporaryDirectory() as path:
+            p2p_topo = sample_point_to_point_topology(path, size=2)
+
+            daemon = RenderDaemon(p2p_topo, os.path.join(path, "render.sock"))
+            daemon.dispatch({"op": "write"})
+            self.assertTrue(daemon.validator.indexed)
+
+            daemon.dispatch({"op": "add_node", "hostname": "xr3", "identity": "2.2.2.2",
+                             "mgmt": "192.168.0.122/24"})
+            with self.assertRaises(RuntimeError):
+                daemon.dispatch({"op": "write"})
+            self.assertEqual(daemon.dispatch({"op": "status"})["dirty"], ["xr3"])
+
+    def test_socket_path_in_use(self):
+        with tempfile.TemporaryDirectory() as path:
+            p2p_topo = PointToPointTopology(name="sample-topology", path=path)
+            socket_path = os.path.join(path, "render.sock")
+
+            with open(socket_path, "w") as unrelated_file:
+                unrelated_file.write("keep me")
+            with self.assertRaises(RuntimeError):
+                RenderDaemon(p2p_topo, socket_path).start()
+            self.assertTrue(os.path.isfile(socket_path))
+            os.remove(socket_path)
+
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stale.bind(socket_path)
+            stale.close()
+
+            daemon = RenderDaemon(p2p_topo, socket_path)
+            thread = daemon.start()
+            with self.assertRaises(RuntimeError):
+                RenderDaemon(p2p_topo, socket_path).start()
+
+            with RenderClient(socket_path) as client:
+                self.assertEqual(client.request("status")["nodes"], 0)
+                client.request("shutdown")
+            thread.join(5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from configgen.isis_topology import ISISTopology
+from configgen.bgp_topology import BGPTopology
+from configgen.render_plan import RenderPlan
+from configgen.constants import *
+from ipaddress import IPv4Address, IPv4Interface
+from tests.helpers import sample_point_to_point_topology
+
+
+class RenderPlanTest(unittest.TestCase):
+    @staticmethod
+    def _build_topology(path: str) -> ISISTopology:
+        config = dict(DEFAULT_CONFIGS)
+        config[ConfigKeys.DEFAULT_ISIS_ADDRESS_FAMILIES] = [AddressFamily.IPv4_UNICAST, AddressFamily.IPv6_UNICAST]
+
+        p2p_topo = sample_point_to_point_topology(path, config=config)
+        p2p_topo.nodes[0].create_new_loopback(IPv4Address("11.1.1.1"), description="anycast")
+        p2p_topo.nodes[1].create_loopback_range(IPv4Address("10.10.0.0"), 3, prefix_len=31, description="customers")
+        p2p_topo.nodes[1].create_new_loopback(IPv4Address("11.2.2.2"), description="anycast")
+        p2p_topo.nodes[2].create_loopback_range(IPv4Address("10.20.0.1"), 2)
+        p2p_topo.nodes[2].interfaces[2].description = "to xr1"
+
+        topo = ISISTopology(p2p_topo, "core", config)
+        topo.generate_isis_topology(
+            {key: [(AddressFamily.IPv4_UNICAST, 10), (AddressFamily.IPv6_UNICAST, 20)]
+             for key in p2p_topo.interface_mapping.keys()},
+            {0: [(AddressFamily.IPv4_UNICAST, 1)], 1: [], 2: [(AddressFamily.IPv6_UNICAST, 5)]}
+        )
+        return topo
+
+    def test_matches_config_writer(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = self._build_topology(path)
+            expected = [topo._render_node(i) for i in range(3)]
+            topo.write_config()
+            written = {}
+            for node in topo.point_to_point_topology.nodes:
+                with open(os.path.join(topo.point_to_point_topology.path, f"{node.hostname}.conf")) as config_file:
+                    written[node.hostname] = config_file.read()
+
+            render_plan = RenderPlan()
+            topo.point_to_point_topology.use_render_plan(render_plan)
+            for i in range(3):
+                self.assertMultiLineEqual(topo._render_node(i), expected[i])
+                self.assertMultiLineEqual(topo.point_to_point_topology._render_node(i),
+                                          expected[i][:expected[i].index("router isis")])
+
+            topo.write_config()
+            for node in topo.point_to_point_topology.nodes:
+                with open(os.path.join(topo.point_to_point_topology.path, f"{node.hostname}.conf")) as config_file:
+                    self.assertMultiLineEqual(config_file.read(), written[node.hostname])
+
+            self.assertEqual(len(render_plan.isis_interface_templates), 2)
+
+    def test_bgp_matches_config_writer(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = BGPTopology(self._build_topology(path))
+            topo._add_node(0, 65000)
+            topo._add_node(2, 65001)
+
+            address = IPv4Interface("100.0.0.1/24")
+            topo.node_dict[0]._add_prefix(address, address.network,
+                                          [AddressFamily.IPv4_UNICAST, AddressFamily.IPv6_UNICAST])
+            topo._add_prefix_range(0, IPv4Address("100.1.0.1"), 3, [AddressFamily.IPv4_UNICAST], prefix_len=30)
+            topo.node_dict[0]._add_neighbor(IPv4Address("3.3.3.3"), 65001, [AddressFamily.IPv4_UNICAST])
+            topo.node_dict[2]._add_neighbor(IPv4Address("1.1.1.1"), 65000, [])
+
+            expected = [topo._render_node(i) for i in range(3)]
+            topo.igp_topology.point_to_point_topology.use_render_plan(RenderPlan())
+            for i in range(3):
+                self.assertMultiLineEqual(topo._render_node(i), expected[i])
+
+
+if __name__ == '__main__':
+    unittest.main()
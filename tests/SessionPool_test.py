@@ -0,0 +1,194 @@
+import tempfile
+import threading
+import unittest
+from configgen.constants import *
+from configgen.audit import DriftAuditor
+from configgen.bundle import ConfigBundle
+from configgen.deployer import Deployer
+from configgen.session_pool import SessionPool
+from tests.helpers import sample_point_to_point_topology
+
+
+class FakeSession:
+    def __init__(self, hostname: str) -> None:
+        self.hostname = hostname
+        self.timeout = 0
+        self.inputs = []
+        self.alive = True
+        self.closed = False
+
+    def input(self, text: str):
+        self.inputs.append(text)
+
+    def new_line(self):
+        self.inputs.append("")
+
+    def read_very_eager(self) -> bytes:
+        if not self.alive:
+            raise EOFError("telnet connection closed")
+        return b""
+
+    def wait_for(self, text: str) -> str:
+        return f"RP/0/RP0/CPU0:{self.hostname}#"
+
+    def check_for(self, cases):
+        if self.inputs[-1] == "show running-config":
+            return 0, None, f"Building configuration...\nhostname {self.hostname}\nend\n".encode("utf-8")
+        return 0, None, f"RP/0/RP0/CPU0:{self.hostname}#".encode("utf-8")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PooledDeployer(Deployer):
+    def __init__(self, *args, **kwargs) -> None:
+        self.opened = []
+        super().__init__(*args, **kwargs)
+
+    def _check_topology(self):
+        pass
+
+    def _open_session(self, hostname: str, timeout: int = Deployer.DEFAULT_TIMEOUT) -> FakeSession:
+        session = FakeSession(hostname)
+        self.opened.append(session)
+        return session
+
+
+class SessionPoolTest(unittest.TestCase):
+    def test_reuse_and_health_check(self):
+        opened = []
+        pool = SessionPool(lambda hostname: opened.append(FakeSession(hostname)) or opened[-1])
+
+        with pool.session("xr1") as session:
+            pass
+        self.assertIs(pool.borrow("xr1"), session)
+        self.assertEqual(session.inputs, [""])
+        pool.release("xr1", session)
+
+        session.alive = False
+        replacement = pool.borrow("xr1")
+        self.assertIsNot(replacement, session)
+        self.assertTrue(session.closed)
+        self.assertEqual(len(opened), 2)
+
+        with self.assertRaises(RuntimeError):
+            with pool.session("xr2") as broken:
+                raise RuntimeError("push failed")
+        self.assertTrue(broken.closed)
+        self.assertEqual(len(pool), 0)
+
+    def test_eviction(self):
+        clock = FakeClock()
+        pool = SessionPool(FakeSession, max_size=2, idle_timeout=60, clock=clock)
+        sessions = {hostname: pool.borrow(hostname) for hostname in ("xr1", "xr2")}
+
+        for hostname, session in sessions.items():
+            clock.now += 10
+            pool.release(hostname, session)
+
+        sessions["xr3"] = pool.borrow("xr3")
+        self.assertTrue(sessions["xr1"].closed)
+        self.assertFalse(sessions["xr2"].closed)
+        clock.now = 40
+        pool.release("xr3", sessions["xr3"])
+        self.assertEqual(pool.idle_sessions(), {"xr2": 1, "xr3": 1})
+
+        clock.now = 85
+        self.assertEqual(pool.evict_idle(), 1)
+        self.assertTrue(sessions["xr2"].closed)
+        self.assertIs(pool.borrow("xr3"), sessions["xr3"])
+
+        pool.release("xr3", sessions["xr3"])
+        pool.close()
+        self.assertTrue(sessions["xr3"].closed)
+        self.assertEqual(len(pool), 0)
+
+    def test_max_size(self):
+        pool = SessionPool(FakeSession, max_size=2, borrow_timeout=0.05)
+        first, second = pool.borrow("xr1"), pool.borrow("xr2")
+
+        with self.assertRaises(RuntimeError):
+            pool.borrow("xr3")
+
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.borrow("xr3")))
+        pool.borrow_timeout = None
+        waiter.start()
+        waiter.join(0.05)
+        self.assertEqual(borrowed, [])
+
+        pool.release("xr1", first)
+        waiter.join(1)
+        self.assertEqual([session.hostname for session in borrowed], ["xr3"])
+        self.assertTrue(first.closed)
+
+        pool.discard(second)
+        self.assertEqual(pool.borrow("xr2").hostname, "xr2")
+
+    def test_concurrent_borrow(self):
+        lock = threading.Lock()
+        counts = {"open": 0, "peak": 0}
+
+        class CountingSession(FakeSession):
+            def __init__(self, hostname: str) -> None:
+                super().__init__(hostname)
+                with lock:
+                    counts["open"] += 1
+                    counts["peak"] = max(counts["peak"], counts["open"])
+
+            def close(self):
+                super().close()
+                with lock:
+                    counts["open"] -= 1
+
+        pool = SessionPool(CountingSession, max_size=3)
+        hostnames = [f"xr{n % 4}" for n in range(40)]
+
+        def use(hostname: str):
+            with pool.session(hostname):
+                pass
+
+        threads = [threading.Thread(target=use, args=(hostname,)) for hostname in hostnames]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(counts["peak"], 3)
+        self.assertEqual(len(pool), counts["open"])
+        self.assertEqual(pool.borrowed, 0)
+
+    def test_deploy_and_audit(self):
+        with tempfile.TemporaryDirectory() as path:
+            p2p_topo = sample_point_to_point_topology(path, size=2)
+            bundle = ConfigBundle(p2p_topo.write_bundle())
+
+            deployer = PooledDeployer(path, "localhost", {"xr1": 5000, "xr2": 5001}, bundle=bundle)
+            pool = deployer.create_session_pool(max_size=4)
+            self.assertEqual(deployer.deploy(), {})
+            self.assertEqual(deployer.deploy(), {})
+            self.assertEqual([session.hostname for session in deployer.opened], ["xr1", "xr2"])
+
+            session = deployer.opened[0]
+            self.assertEqual(session.inputs[:4], ["configure", bundle.read("xr1"), "commit", END])
+            self.assertEqual(session.inputs.count("commit"), 2)
+            self.assertFalse(session.closed)
+
+            reports = DriftAuditor(deployer).audit()
+            self.assertEqual(set(reports), {"xr1", "xr2"})
+            self.assertEqual(len(deployer.opened), 2)
+            self.assertEqual(session.timeout, 0)
+            self.assertEqual(pool.idle_sessions(), {"xr1": 1, "xr2": 1})
+            pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
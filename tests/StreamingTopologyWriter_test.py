@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.streaming import StreamingTopologyWriter
+from configgen.render_plan import RenderPlan
+from configgen.constants import *
+
+
+class StreamingTopologyWriterTest(unittest.TestCase):
+    NODES = [(f"xr{n}", f"1.1.1.{n}", f"192.168.0.{n}/24") for n in range(1, 8)]
+
+    LINKS = [(0, 1), (1, 2), (5, 0), (2, 3), (3, 6), (6, 0), (4, 5), (2, 5), (1, 6)]
+
+    @staticmethod
+    def _read_configs(path: str) -> dict:
+        configs = {}
+        for file_name in os.listdir(path):
+            with open(os.path.join(path, file_name)) as config_file:
+                configs[file_name] = config_file.read()
+        return configs
+
+    def test_matches_eager_write_config(self):
+        with tempfile.TemporaryDirectory() as path:
+            p2p_topo = PointToPointTopology(name="eager", path=path)
+            p2p_topo.generate_point_to_point_topology(self.NODES, self.LINKS)
+            p2p_topo.write_config()
+            expected = self._read_configs(p2p_topo.path)
+
+            for bucket_size in (1, 3, 16):
+                streaming_writer = StreamingTopologyWriter(f"streaming-{bucket_size}", path, bucket_size=bucket_size)
+                self.assertEqual(streaming_writer.write_config(iter(self.NODES), iter(self.LINKS)), len(self.NODES))
+                self.assertEqual(self._read_configs(streaming_writer.path), expected)
+
+            streaming_writer = StreamingTopologyWriter("planned", path, bucket_size=2)
+            streaming_writer.use_render_plan(RenderPlan())
+            streaming_writer.write_config(self.NODES, self.LINKS)
+            self.assertEqual(self._read_configs(streaming_writer.path), expected)
+
+    def test_unknown_node(self):
+        with tempfile.TemporaryDirectory() as path:
+            streaming_writer = StreamingTopologyWriter("unknown", path, bucket_size=2)
+            with self.assertRaises(RuntimeError):
+                streaming_writer.write_config(self.NODES[:3], [(0, 1), (2, 3)])
+            with self.assertRaises(RuntimeError):
+                streaming_writer.write_config(self.NODES[:3], [(0, 1), (1, 6)])
+
+    def test_subnet_exhaustion(self):
+        config = dict(DEFAULT_CONFIGS)
+        config[ConfigKeys.DATA_LINK_NETWORK] = "10.0.0.0/29"
+        config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 30
+
+        with tempfile.TemporaryDirectory() as path:
+            streaming_writer = StreamingTopologyWriter("exhausted", path, config)
+            with self.assertRaises(RuntimeError):
+                streaming_writer.write_config(self.NODES[:3], [(0, 1), (1, 2), (2, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+from ipaddress import IPv4Address, IPv4Interface
+from configgen.constants import *
+from configgen.isis_topology import ISISTopology
+from configgen.bgp_topology import BGPTopology
+from configgen.inventory import Inventory, InventoryEntry
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.sharding import TopologySharder, LocalShardRunner, run_shard_job
+
+
+class TopologySharderTest(unittest.TestCase):
+    @staticmethod
+    def _ring_topology(path: str, size: int) -> PointToPointTopology:
+        topo = PointToPointTopology(name="shard-topology", path=path)
+        topo.generate_point_to_point_topology(
+            [(f"xr{n}", f"10.0.0.{n + 1}", f"192.168.0.{n + 1}/24") for n in range(size)],
+            [(n, (n + 1) % size) for n in range(size)]
+        )
+        return topo
+
+    def test_partition(self):
+        topo = self._ring_topology("../topo-dump", 12)
+        shards = TopologySharder(topo, 3).partition()
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sorted(i for shard in shards for i in shard.node_indices), list(range(12)))
+        self.assertEqual([len(shard.node_indices) for shard in shards], [4, 4, 4])
+
+        for shard in shards:
+            members = set(shard.node_indices)
+            internal = sum(1 for i in members for j in topo.get_neighbors(i) if j in members)
+            self.assertEqual(internal, 2 * (len(members) - 1))
+
+    def test_local_runner(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = self._ring_topology(path, 6)
+            topo.write_config()
+
+            sharder = TopologySharder(topo, 2)
+            results = LocalShardRunner().run(sharder.export_jobs(sharder.partition()))
+
+            self.assertEqual(sorted(results.keys()), sorted(node.hostname for node in topo.nodes))
+            for hostname, result in results.items():
+                with open(os.path.join(topo.path, f"{hostname}.conf")) as expected, \
+                        open(os.path.join(topo.path, f"shard-{result['shard']}", f"{hostname}.conf")) as actual:
+                    self.assertMultiLineEqual(actual.read(), expected.read())
+
+    def test_isis_and_bgp_layers(self):
+        with tempfile.TemporaryDirectory() as path:
+            p2p_topo = self._ring_topology(path, 6)
+            isis_topo = ISISTopology(p2p_topo, "core", DEFAULT_CONFIGS)
+            isis_topo.generate_isis_topology(
+                {key: [(AddressFamily.IPv4_UNICAST, 10 + key[0])] for key in p2p_topo.interface_mapping.keys()},
+                {i: [(AddressFamily.IPv4_UNICAST, 1)] for i in range(6)}
+            )
+
+            topo = BGPTopology(isis_topo)
+            topo._add_node(0, 65000)
+            topo._add_node(3, 65000)
+            address = IPv4Interface("100.0.0.1/24")
+            topo.node_dict[0]._add_prefix(address, address.network, [AddressFamily.IPv4_UNICAST])
+            topo._add_prefix_range(0, IPv4Address("10.10.0.0"), 4, [AddressFamily.IPv4_UNICAST])
+            topo.node_dict[0]._add_neighbor(IPv4Address("10.0.0.4"), 65000, [AddressFamily.IPv4_UNICAST])
+
+            sharder = TopologySharder(topo, 2)
+            results = LocalShardRunner().run(sharder.export_jobs(sharder.partition()))
+
+            for i, node in enumerate(p2p_topo.nodes):
+                with open(os.path.join(p2p_topo.path, f"shard-{results[node.hostname]['shard']}",
+                                       f"{node.hostname}.conf")) as actual:
+                    rendered = actual.read()
+                self.assertIn("router isis core", rendered)
+                self.assertEqual("router bgp 65000" in rendered, i in (0, 3))
+                # update-source renders the interface object itself, which differs per process
+                self.assertEqual(
+                    [line for line in rendered.split("\n") if "update-source" not in line],
+                    [line for line in topo._render_node(i).split("\n") if "update-source" not in line]
+                )
+
+    @staticmethod
+    def _closed_port() -> int:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+        s.close()
+        return port
+
+    def test_deploy_failure(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = self._ring_topology(path, 4)
+            inventory = Inventory([
+                InventoryEntry(node.hostname, "127.0.0.1", self._closed_port(), "admin", "secret")
+                for node in topo.nodes
+            ])
+
+            sharder = TopologySharder(topo, 2)
+            jobs = sharder.export_jobs(sharder.partition(), inventory)
+            result = run_shard_job(jobs[0])
+            self.assertEqual(len(result["hosts"]), 2)
+            for host in result["hosts"].values():
+                self.assertTrue(host["rendered"])
+                self.assertFalse(host["deployed"])
+                self.assertIn("refused", host["error"])
+
+            results = LocalShardRunner().run(jobs)
+            self.assertEqual(sorted(results.keys()), sorted(node.hostname for node in topo.nodes))
+            self.assertTrue(all(host["error"] for host in results.values()))
+
+    def test_write_jobs_without_credentials(self):
+        with tempfile.TemporaryDirectory() as path:
+            topo = self._ring_topology(path, 4)
+            inventory = Inventory([
+                InventoryEntry(node.hostname, "127.0.0.1", 5000 + n, "admin", "secret")
+                for n, node in enumerate(topo.nodes)
+            ])
+
+            sharder = TopologySharder(topo, 2)
+            jobs = sharder.export_jobs(sharder.partition(), inventory)
+            job_files = TopologySharder.write_jobs(jobs, os.path.join(path, "jobs"))
+
+            for job_file in job_files:
+                with open(job_file) as f:
+                    contents = f.read()
+                self.assertNotIn("secret", contents)
+                for row in json.loads(contents)["deploy"]["inventory"]:
+                    self.assertEqual(row[3:], [None, None])
+
+            job_files = TopologySharder.write_jobs(jobs, os.path.join(path, "secret-jobs"), include_credentials=True)
+            self.assertEqual(os.stat(job_files[0]).st_mode & 0o777, 0o600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import unittest
+from ipaddress import IPv4Address
+from configgen.constants import *
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.isis_topology import ISISTopology
+from configgen.validator import IncrementalValidator, TopologyValidationError
+
+
+class TopologyValidatorTest(unittest.TestCase):
+    @staticmethod
+    def _sample_topology(node_identifiers, links) -> PointToPointTopology:
+        topo = PointToPointTopology(name="validator-topology", path="../topo-dump")
+        topo.generate_point_to_point_topology(node_identifiers, links)
+        return topo
+
+    def test_valid_topology(self):
+        topo = self._sample_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+                ("xr3", "3.3.3.3", "192.168.0.122/24"),
+            ],
+            [(0, 1), (1, 2), (2, 0)]
+        )
+
+        self.assertEqual(topo.validate(), [])
+
+    def test_duplicate_addresses(self):
+        topo = self._sample_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "1.1.1.1", "192.168.0.121/24"),
+                ("xr2", "3.3.3.3", "192.168.0.120/24"),
+            ],
+            [(0, 1), (1, 0), (2, 2)]
+        )
+
+        kinds = sorted(str(conflict.kind) for conflict in topo.validate())
+        self.assertEqual(kinds, sorted([
+            str(ConflictKind.DUPLICATE_HOSTNAME),
+            str(ConflictKind.DUPLICATE_IDENTITY),
+            str(ConflictKind.DUPLICATE_MGMT),
+            str(ConflictKind.DUPLICATE_LINK),
+            str(ConflictKind.SELF_LINK),
+        ]))
+
+        with self.assertRaises(TopologyValidationError):
+            topo.write_config()
+
+    def test_incremental(self):
+        topo = self._sample_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+            ],
+            [(0, 1)]
+        )
+        validator = IncrementalValidator(topo)
+        validator.index()
+
+        topo.add_node("xr3", "3.3.3.3", "192.168.0.122/24")
+        topo.add_link(1, 2)
+        self.assertEqual(validator.validate_new(), [])
+        self.assertEqual((validator.checked_nodes, validator.checked_links), (3, 2))
+
+        topo.add_node("xr4", "1.1.1.1", "192.168.0.123/24")
+        k = topo.add_link(2, 1)
+        topo.link_interfaces[k][0].network = topo.link_interfaces[0][0].network
+        kinds = sorted(str(conflict.kind) for conflict in validator.validate_new())
+        self.assertEqual(kinds, sorted([
+            str(ConflictKind.DUPLICATE_IDENTITY),
+            str(ConflictKind.DUPLICATE_LINK),
+            str(ConflictKind.OVERLAPPING_SUBNET),
+        ]))
+        self.assertEqual((validator.checked_nodes, validator.checked_links), (3, 2))
+        self.assertEqual(len(validator.validate_new()), 3)
+
+    def test_overlapping_subnets(self):
+        config = dict(DEFAULT_CONFIGS)
+        config[ConfigKeys.DATA_LINK_NETWORK] = "172.50.0.0/24"
+        config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 30
+
+        topo = PointToPointTopology(name="validator-topology", path="../topo-dump", config=config)
+        topo.generate_point_to_point_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+                ("xr3", "3.3.3.3", "192.168.0.122/24"),
+            ],
+            [(0, 1), (1, 2)]
+        )
+        topo.link_interfaces[1][0].network = topo.link_interfaces[0][0].network
+
+        conflicts = topo.validate()
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].kind, ConflictKind.OVERLAPPING_SUBNET)
+        self.assertEqual(conflicts[0].links, [(1, 2), (0, 1)])
+
+    def test_subnet_overlapping_node_addresses(self):
+        config = dict(DEFAULT_CONFIGS)
+        config[ConfigKeys.DATA_LINK_NETWORK] = "172.50.0.0/16"
+        config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 24
+
+        topo = PointToPointTopology(name="validator-topology", path="../topo-dump", config=config)
+        topo.generate_point_to_point_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "172.50.1.5/24"),
+                ("xr3", "172.50.0.9", "192.168.0.122/24"),
+            ],
+            [(0, 1), (1, 2)]
+        )
+
+        conflicts = topo.validate()
+        self.assertEqual([conflict.kind for conflict in conflicts], [ConflictKind.OVERLAPPING_SUBNET] * 2)
+        self.assertIn("link 0 xr1 (0) -> xr2 (1) overlaps identity 172.50.0.9 of xr3 (2)", conflicts[0].message)
+        self.assertIn("link 1 xr2 (1) -> xr3 (2) overlaps management address 172.50.1.5 of xr2 (1)",
+                      conflicts[1].message)
+        self.assertEqual(conflicts[0].nodes, [2, 0, 1])
+        self.assertEqual(conflicts[0].links, [(0, 1)])
+
+    def test_incremental_subnet_overlapping_node_addresses(self):
+        config = dict(DEFAULT_CONFIGS)
+        config[ConfigKeys.DATA_LINK_NETWORK] = "172.50.0.0/16"
+        config[ConfigKeys.DATA_LINK_SUBNET_LEN] = 24
+
+        topo = PointToPointTopology(name="validator-topology", path="../topo-dump", config=config)
+        topo.generate_point_to_point_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "172.50.1.5/24"),
+            ],
+            [(0, 1)]
+        )
+        validator = IncrementalValidator(topo)
+        validator.index()
+
+        topo.add_node("xr3", "172.50.0.9", "192.168.0.122/24")
+        topo.add_link(1, 2)
+        conflicts = validator.validate_new()
+        self.assertEqual(sorted(conflict.message for conflict in conflicts), [
+            "subnet of link 0 xr1 (0) -> xr2 (1) overlaps identity 172.50.0.9 of xr3 (2)",
+            "subnet of link 1 xr2 (1) -> xr3 (2) overlaps management address 172.50.1.5 of xr2 (1)",
+        ])
+        self.assertEqual((validator.checked_nodes, validator.checked_links), (2, 1))
+
+    def test_overlapping_loopback_ranges(self):
+        topo = self._sample_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+            ],
+            [(0, 1)]
+        )
+        topo.nodes[0].create_loopback_range(IPv4Address("10.0.0.0"), 8)
+        topo.nodes[1].create_loopback_range(IPv4Address("10.0.1.0"), 4, prefix_len=30)
+        self.assertEqual(topo.validate(), [])
+
+        topo.nodes[1].create_loopback_range(IPv4Address("10.0.0.6"), 2)
+        topo.nodes[1].create_new_loopback(IPv4Address("10.0.1.9"))
+        conflicts = topo.validate()
+        self.assertEqual([conflict.kind for conflict in conflicts], [ConflictKind.OVERLAPPING_SUBNET] * 2)
+        self.assertIn("loopback range 10.0.0.6 x2 of xr2 (1)", conflicts[0].message)
+        self.assertIn("Loopback 7 of xr2 (1) overlaps loopback range 10.0.1.0 x4", conflicts[1].message)
+
+    def test_dangling_isis_link(self):
+        p2p_topo = self._sample_topology(
+            [
+                ("xr1", "1.1.1.1", "192.168.0.120/24"),
+                ("xr2", "2.2.2.2", "192.168.0.121/24"),
+                ("xr3", "3.3.3.3", "192.168.0.122/24"),
+            ],
+            [(0, 1), (1, 2)]
+        )
+
+        topo = ISISTopology(p2p_topo, "core", DEFAULT_CONFIGS)
+        with self.assertRaises(TopologyValidationError) as context:
+            topo.generate_isis_topology({
+                (0, 1): [(AddressFamily.IPv4_UNICAST, 10)],
+                (0, 2): [(AddressFamily.IPv4_UNICAST, 10)],
+            }, {
+                0: [(AddressFamily.IPv4_UNICAST, 1)],
+                5: [(AddressFamily.IPv4_UNICAST, 1)],
+            })
+
+        conflicts = context.exception.conflicts
+        self.assertEqual([conflict.kind for conflict in conflicts],
+                         [ConflictKind.DANGLING_LINK, ConflictKind.UNKNOWN_NODE])
+        self.assertIn("xr1 (0) -> xr3 (2)", conflicts[0].message)
+        self.assertEqual(topo.nodes[0].interfaces, [])
+
+        with self.assertRaises(TopologyValidationError):
+            topo._add_link(0, 2, [(AddressFamily.IPv4_UNICAST, 10)])
+
+        topo.af_metric_descriptor = {(0, 2): [(AddressFamily.IPv4_UNICAST, 10)]}
+        conflicts = topo.validate()
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].kind, ConflictKind.DANGLING_LINK)
+
+        with self.assertRaises(TopologyValidationError):
+            topo.write_config()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+from typing import List, Tuple
+from configgen.constants import *
+from configgen.deployer import Deployer
+from configgen.point_to_point_topology import PointToPointTopology
+from configgen.isis_topology import ISISTopology
+
+SAMPLE_HOSTS = [
+    ("xr1", "1.1.1.1", "192.168.0.120/24"),
+    ("xr2", "2.2.2.2", "192.168.0.121/24"),
+    ("xr3", "3.3.3.3", "192.168.0.122/24"),
+]
+
+
+class OfflineDeployer(Deployer):
+    def _check_topology(self):
+        pass
+
+
+def sample_links(size: int) -> List[Tuple[int, int]]:
+    if size < 3:
+        return [(0, 1)][:size - 1]
+    return [(n, (n + 1) % size) for n in range(size)]
+
+
+def sample_point_to_point_topology(path: str = "../topo-dump", size: int = 3,
+                                   config: dict = DEFAULT_CONFIGS) -> PointToPointTopology:
+    """
+    The first size sample hosts, linked in a ring (or by a single link for two hosts).
+    """
+    topo = PointToPointTopology(name="sample-topology", path=path, config=config)
+    topo.generate_point_to_point_topology(SAMPLE_HOSTS[:size], sample_links(size))
+    return topo
+
+
+def sample_isis_topology(path: str = "../topo-dump", size: int = 3) -> ISISTopology:
+    """
+    The sample point to point topology under ISIS process core, with metric 10 on every
+    data link and metric 1 on every identity loopback.
+    """
+    p2p_topo = sample_point_to_point_topology(path, size)
+    topo = ISISTopology(p2p_topo, "core", DEFAULT_CONFIGS)
+    topo.generate_isis_topology(
+        {key: [(AddressFamily.IPv4_UNICAST, 10)] for key in p2p_topo.interface_mapping.keys()},
+        {i: [(AddressFamily.IPv4_UNICAST, 1)] for i in range(size)}
+    )
+    return topo